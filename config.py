@@ -387,11 +387,21 @@ class DefaultConfig(ImmutableConfig):
     # Feature Flag: Whether to track and display image pull statistics
     FEATURE_IMAGE_PULL_STATS = False
 
-    # Pull metrics thread pool configuration
+    # Pull metrics Redis connection pool size, shared by the flusher thread and readers
     PULL_METRICS_WORKER_COUNT = 5
 
+    # Pull metrics batching: events are written to Redis in batches of up to this many,
+    # or whatever has been queued once the flush interval elapses
+    PULL_METRICS_BATCH_SIZE = 32
+    PULL_METRICS_FLUSH_INTERVAL_MS = 500
+
+    # Maximum number of pull events waiting for the flusher; further events are dropped
+    PULL_METRICS_QUEUE_SIZE = 10000
+
     # Redis flush worker configuration
     REDIS_FLUSH_INTERVAL_SECONDS = 300  # 5 minutes default
+    # Redis protocol version used by the flush worker; 3 (RESP3) requires Redis 6 or later
+    REDIS_FLUSH_WORKER_PROTOCOL = 2
 
     # Semver spec for which Docker versions we will blacklist
     # Documentation: http://pythonhosted.org/semantic_version/reference.html#semantic_version.Spec
@@ -9,15 +9,15 @@ This module provides functions for managing pull statistics data:
 
 import logging
 from datetime import datetime
-from functools import reduce
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from peewee import Case, IntegrityError, fn
+from peewee import EXCLUDED, Case, Field, IntegrityError, MySQLDatabase, fn
 
 from data.database import (
     ManifestPullStatistics,
     Repository,
     TagPullStatistics,
+    db,
     db_transaction,
 )
 from data.model import DataModelException
@@ -33,6 +33,54 @@ class PullStatisticsException(DataModelException):
     pass
 
 
+# Rows per INSERT ... ON CONFLICT statement, keeping the bound parameter count well under
+# SQLite's variable limit
+UPSERT_CHUNK_SIZE = 100
+
+
+def _excluded(field: Field):
+    """
+    Returns the value a conflicting INSERT attempted to write into the given field.
+    """
+    if isinstance(db.obj, MySQLDatabase):
+        return fn.VALUES(field)
+    return getattr(EXCLUDED, field.column_name)
+
+
+def _upsert_pull_statistics(
+    model,
+    rows: List[Dict],
+    conflict_target: List[Field],
+    count_field: Field,
+    date_field: Field,
+    replace_fields: Sequence[Field] = (),
+) -> int:
+    """
+    Inserts the given rows, or on a unique key conflict adds the incoming count to the stored
+    one, keeps the later of the two dates and overwrites any replace_fields.
+
+    Each chunk is a single INSERT ... ON CONFLICT DO UPDATE (ON DUPLICATE KEY UPDATE on MySQL).
+    """
+    new_date = _excluded(date_field)
+    update = {
+        count_field: count_field + _excluded(count_field),
+        date_field: Case(None, ((date_field < new_date, new_date),), date_field),
+    }
+    for field in replace_fields:
+        update[field] = _excluded(field)
+
+    # MySQL infers the conflicting key itself and rejects an explicit conflict target
+    if isinstance(db.obj, MySQLDatabase):
+        conflict_target = []
+
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        model.insert_many(rows[i : i + UPSERT_CHUNK_SIZE]).on_conflict(
+            conflict_target=conflict_target, update=update
+        ).execute()
+
+    return len(rows)
+
+
 def bulk_upsert_tag_statistics(tag_updates: List[Dict]) -> int:
     """
     Upsert tag pull statistics in bulk using optimized batch operations.
@@ -87,97 +135,38 @@ def bulk_upsert_tag_statistics(tag_updates: List[Dict]) -> int:
                     logger.error(f"Failed to parse tag update: {e}")
                     raise PullStatisticsException(f"Invalid tag update data: {e}")
 
-            # Build conditions for existing records lookup
-            # Create a list of (repository_id, tag_name) tuples for bulk lookup
-            lookup_keys = [(u["repository_id"], u["tag_name"]) for u in parsed_updates]
-
-            # Chunk the lookup to avoid SQLite parser stack overflow with large OR queries
-            CHUNK_SIZE = 50  # Reasonable limit for OR conditions
-            existing_records = {}
-
-            for i in range(0, len(lookup_keys), CHUNK_SIZE):
-                chunk = lookup_keys[i : i + CHUNK_SIZE]
-
-                if chunk:
-                    conditions = []
-                    for repo_id, tag_name in chunk:
-                        conditions.append(
-                            (TagPullStatistics.repository == repo_id)
-                            & (TagPullStatistics.tag_name == tag_name)
-                        )
-
-                    # Combine all conditions with OR using bitwise operator
-                    combined_condition = reduce(lambda a, b: a | b, conditions)
-                    existing_query = TagPullStatistics.select().where(combined_condition)
-
-                    # Add results to our existing_records map
-                    for record in existing_query:
-                        key = (record.repository.id, record.tag_name)
-                        existing_records[key] = record
-
-            # Separate updates into existing vs new records
-            updates_for_existing = []
-            new_records_data = []
-
+            # Collapse repeated keys so one statement never touches the same row twice,
+            # which ON CONFLICT DO UPDATE rejects
+            rows: Dict[Tuple[int, str], Dict] = {}
             for update in parsed_updates:
                 key = (update["repository_id"], update["tag_name"])
-
-                if key in existing_records:
-                    # Record exists - prepare for bulk update
-                    existing_record = existing_records[key]
-
-                    # Note: update["pull_count"] represents new pulls since last flush (from Redis),
-                    increment = update["pull_count"]
-
-                    updates_for_existing.append(
-                        {
-                            "record": existing_record,
-                            "increment": increment,
-                            "new_date": update[
-                                "last_pull_date"
-                            ],  # Pass incoming date, make SQL handle the latest between the concurrent requestsmax
-                            "new_digest": update["manifest_digest"],
-                        }
-                    )
+                row = rows.get(key)
+                if row is None:
+                    rows[key] = {
+                        "repository": update["repository_id"],
+                        "tag_name": update["tag_name"],
+                        "tag_pull_count": update["pull_count"],
+                        "last_tag_pull_date": update["last_pull_date"],
+                        "current_manifest_digest": update["manifest_digest"],
+                    }
                 else:
-                    # New record - prepare for bulk insert
-                    new_records_data.append(
-                        {
-                            "repository": update["repository_id"],
-                            "tag_name": update["tag_name"],
-                            "tag_pull_count": update["pull_count"],
-                            "last_tag_pull_date": update["last_pull_date"],
-                            "current_manifest_digest": update["manifest_digest"],
-                        }
+                    row["tag_pull_count"] += update["pull_count"]
+                    row["last_tag_pull_date"] = max(
+                        row["last_tag_pull_date"], update["last_pull_date"]
                     )
-
-            rows_affected = 0
-
-            # Bulk update existing records
-            # Use atomic SQL updates to avoid race conditions with concurrent flush workers
-            for update_data in updates_for_existing:
-                record = update_data["record"]
-                increment = update_data["increment"]
-                new_date = update_data["new_date"]
-                # Use atomic SQL update: tag_pull_count = tag_pull_count + increment
-                # This prevents race conditions where multiple flush workers update simultaneously
-                TagPullStatistics.update(
-                    tag_pull_count=TagPullStatistics.tag_pull_count + increment,
-                    last_tag_pull_date=Case(
-                        None,
-                        ((TagPullStatistics.last_tag_pull_date < new_date, new_date),),
-                        TagPullStatistics.last_tag_pull_date,
-                    ),
-                    current_manifest_digest=update_data["new_digest"],
-                ).where(TagPullStatistics.id == record.id).execute()
-                rows_affected += 1
-
-            # Bulk insert new records
-            if new_records_data:
-                TagPullStatistics.insert_many(new_records_data).execute()
-                rows_affected += len(new_records_data)
-
-            return rows_affected
+                    row["current_manifest_digest"] = update["manifest_digest"]
+
+            # Note: pull_count represents new pulls since last flush (from Redis), so existing
+            # rows are incremented atomically and CASE keeps the latest timestamp between
+            # concurrent flush workers
+            return _upsert_pull_statistics(
+                TagPullStatistics,
+                list(rows.values()),
+                conflict_target=[TagPullStatistics.repository, TagPullStatistics.tag_name],
+                count_field=TagPullStatistics.tag_pull_count,
+                date_field=TagPullStatistics.last_tag_pull_date,
+                replace_fields=[TagPullStatistics.current_manifest_digest],
+            )
 
     except (IntegrityError, Exception) as e:
         logger.error(f"Failed to bulk upsert tag statistics: {e}")
@@ -236,91 +225,33 @@ def bulk_upsert_manifest_statistics(manifest_updates: List[Dict]) -> int:
                     logger.error(f"Failed to parse manifest update: {e}")
                     raise PullStatisticsException(f"Invalid manifest update data: {e}")
 
-            # Build conditions for existing records lookup
-            # Create a list of (repository_id, manifest_digest) tuples for bulk lookup
-            lookup_keys = [(u["repository_id"], u["manifest_digest"]) for u in parsed_updates]
-
-            # Chunk the lookup to avoid SQLite parser stack overflow with large OR queries
-            CHUNK_SIZE = 50  # Reasonable limit for OR conditions
-            existing_records = {}
-
-            for i in range(0, len(lookup_keys), CHUNK_SIZE):
-                chunk = lookup_keys[i : i + CHUNK_SIZE]
-
-                if chunk:
-                    conditions = []
-                    for repo_id, manifest_digest in chunk:
-                        conditions.append(
-                            (ManifestPullStatistics.repository == repo_id)
-                            & (ManifestPullStatistics.manifest_digest == manifest_digest)
-                        )
-
-                    # Combine all conditions with OR using bitwise operator
-                    combined_condition = reduce(lambda a, b: a | b, conditions)
-                    existing_query = ManifestPullStatistics.select().where(combined_condition)
-
-                    # Add results to our existing_records map
-                    for record in existing_query:
-                        key = (record.repository.id, record.manifest_digest)
-                        existing_records[key] = record
-
-            # Separate updates into existing vs new records
-            updates_for_existing = []
-            new_records_data = []
-
+            rows: Dict[Tuple[int, str], Dict] = {}
             for update in parsed_updates:
                 key = (update["repository_id"], update["manifest_digest"])
-
-                if key in existing_records:
-                    # Record exists - prepare for bulk update
-                    existing_record = existing_records[key]
-
-                    # Note: update["pull_count"] represents new pulls since last flush (from Redis),
-                    increment = update["pull_count"]
-
-                    updates_for_existing.append(
-                        {
-                            "record": existing_record,
-                            "increment": increment,
-                            "new_date": update["last_pull_date"],
-                        }
-                    )
+                row = rows.get(key)
+                if row is None:
+                    rows[key] = {
+                        "repository": update["repository_id"],
+                        "manifest_digest": update["manifest_digest"],
+                        "manifest_pull_count": update["pull_count"],
+                        "last_manifest_pull_date": update["last_pull_date"],
+                    }
                 else:
-                    # New record - prepare for bulk insert
-                    new_records_data.append(
-                        {
-                            "repository": update["repository_id"],
-                            "manifest_digest": update["manifest_digest"],
-                            "manifest_pull_count": update["pull_count"],
-                            "last_manifest_pull_date": update["last_pull_date"],
-                        }
+                    row["manifest_pull_count"] += update["pull_count"]
+                    row["last_manifest_pull_date"] = max(
+                        row["last_manifest_pull_date"], update["last_pull_date"]
                     )
 
-            rows_affected = 0
-
-            # Bulk update existing records
-            for update_data in updates_for_existing:
-                record = update_data["record"]
-                increment = update_data["increment"]
-                new_date = update_data["new_date"]
-                # Use atomic SQL update: manifest_pull_count = manifest_pull_count + increment
-                # For timestamp,  CASE will atomically keep the latest timestamp
-                ManifestPullStatistics.update(
-                    manifest_pull_count=ManifestPullStatistics.manifest_pull_count + increment,
-                    last_manifest_pull_date=Case(
-                        None,
-                        ((ManifestPullStatistics.last_manifest_pull_date < new_date, new_date),),
-                        ManifestPullStatistics.last_manifest_pull_date,
-                    ),
-                ).where(ManifestPullStatistics.id == record.id).execute()
-                rows_affected += 1
-
-            # Bulk insert new records
-            if new_records_data:
-                ManifestPullStatistics.insert_many(new_records_data).execute()
-                rows_affected += len(new_records_data)
-
-            return rows_affected
+            return _upsert_pull_statistics(
+                ManifestPullStatistics,
+                list(rows.values()),
+                conflict_target=[
+                    ManifestPullStatistics.repository,
+                    ManifestPullStatistics.manifest_digest,
+                ],
+                count_field=ManifestPullStatistics.manifest_pull_count,
+                date_field=ManifestPullStatistics.last_manifest_pull_date,
+            )
 
     except (IntegrityError, Exception) as e:
         logger.error(f"Failed to bulk upsert manifest statistics: {e}")
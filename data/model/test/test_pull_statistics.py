@@ -558,6 +558,35 @@ class TestPullStatistics:
         )  # SQL CASE keeps later date atomically (max for timestamp)
         assert updated.current_manifest_digest == "sha256:new"  # But update manifest
 
+    def test_bulk_upsert_duplicate_keys_in_batch(self, initialized_db):
+        """Test that repeated keys within one batch are merged into a single upserted row."""
+        tag_updates = [
+            {
+                "repository_id": self.repo_id,
+                "tag_name": "dup",
+                "manifest_digest": "sha256:first",
+                "pull_count": 2,
+                "last_pull_timestamp": datetime(2024, 1, 5, 12, 0, 0),
+            },
+            {
+                "repository_id": self.repo_id,
+                "tag_name": "dup",
+                "manifest_digest": "sha256:second",
+                "pull_count": 3,
+                "last_pull_timestamp": datetime(2024, 1, 1, 12, 0, 0),
+            },
+        ]
+
+        rows_affected = bulk_upsert_tag_statistics(tag_updates)
+        assert rows_affected == 1
+
+        stats = TagPullStatistics.get(
+            TagPullStatistics.repository == self.repo_id, TagPullStatistics.tag_name == "dup"
+        )
+        assert stats.tag_pull_count == 5
+        assert stats.last_tag_pull_date == datetime(2024, 1, 5, 12, 0, 0)
+        assert stats.current_manifest_digest == "sha256:second"
+
     def test_delete_tag_clears_pull_statistics(self, initialized_db):
         """Test that deleting a tag clears its pull statistics."""
         with patch("data.model.oci.tag.features") as mock_features:
@@ -1,3 +1,4 @@
+import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -8,6 +9,7 @@ from util.saas.exceptionlog import (
     FakeSentryClient,
     Sentry,
     _sentry_before_send_ignore_known,
+    _try_import_sentry,
 )
 
 
@@ -37,7 +39,7 @@ class TestExceptionLogSentry:
     def test_sentry_initialization_with_app_fake_sentry(self):
         """Test that Sentry initializes with FakeSentry when configured."""
         mock_app = MagicMock()
-        mock_app.config.get.return_value = "FakeSentry"
+        mock_app.config = {"EXCEPTION_LOG_TYPE": "FakeSentry"}
 
         sentry = Sentry(mock_app)
 
@@ -48,15 +50,14 @@ class TestExceptionLogSentry:
     def test_sentry_initialization_with_app_real_sentry(self):
         """Test that Sentry initializes with real Sentry when configured."""
         mock_app = MagicMock()
-        mock_app.config.get.return_value = "Sentry"
-        mock_app.config.get.side_effect = lambda key, default=None: {
+        mock_app.config = {
             "EXCEPTION_LOG_TYPE": "Sentry",
             "SENTRY_DSN": "https://test@sentry.io/123",
             "SENTRY_ENVIRONMENT": "test",
             "SENTRY_TRACES_SAMPLE_RATE": 0.5,
             "SENTRY_SAMPLE_RATE": 0.1,
             "SENTRY_PROFILES_SAMPLE_RATE": 0.3,
-        }.get(key, default)
+        }
 
         with patch("util.saas.exceptionlog.sentry_sdk") as mock_sentry_sdk:
             # Mock the return value of sentry_sdk.init
@@ -81,13 +82,37 @@ class TestExceptionLogSentry:
             # Verify the initialized Sentry SDK object is returned
             assert sentry.state is mock_initialized_sentry
 
+    def test_try_import_sentry_memoizes_module(self):
+        """Test that the Sentry SDK is imported on first use and then reused."""
+        with patch("util.saas.exceptionlog.sentry_sdk", None):
+            assert _try_import_sentry() is sentry_sdk
+
+            import util.saas.exceptionlog as exceptionlog
+
+            assert exceptionlog.sentry_sdk is sentry_sdk
+
+    def test_try_import_sentry_not_installed(self):
+        """Test that a missing Sentry SDK yields None and falls back to FakeSentry."""
+        mock_app = MagicMock()
+        mock_app.config = {
+            "EXCEPTION_LOG_TYPE": "Sentry",
+            "SENTRY_DSN": "https://test@sentry.io/123",
+        }
+
+        with patch("util.saas.exceptionlog.sentry_sdk", None):
+            with patch.dict(sys.modules, {"sentry_sdk": None}):
+                assert _try_import_sentry() is None
+
+                sentry = Sentry(mock_app)
+                assert isinstance(sentry.state, FakeSentry)
+
     def test_sentry_initialization_with_empty_dsn(self):
         """Test that Sentry initializes with FakeSentry when DSN is empty."""
         mock_app = MagicMock()
-        mock_app.config.get.side_effect = lambda key, default=None: {
+        mock_app.config = {
             "EXCEPTION_LOG_TYPE": "Sentry",
             "SENTRY_DSN": "",
-        }.get(key, default)
+        }
 
         with patch("util.saas.exceptionlog.sentry_sdk") as mock_sentry_sdk:
             sentry = Sentry(mock_app)
@@ -101,10 +126,10 @@ class TestExceptionLogSentry:
     def test_sentry_initialization_default_config(self):
         """Test that Sentry uses default config values when not specified."""
         mock_app = MagicMock()
-        mock_app.config.get.side_effect = lambda key, default=None: {
+        mock_app.config = {
             "EXCEPTION_LOG_TYPE": "Sentry",
             "SENTRY_DSN": "https://test@sentry.io/123",
-        }.get(key, default)
+        }
 
         with patch("util.saas.exceptionlog.sentry_sdk") as mock_sentry_sdk:
             # Mock the return value of sentry_sdk.init
@@ -130,10 +155,42 @@ class TestExceptionLogSentry:
             # Verify the initialized Sentry SDK object is returned
             assert sentry.state is mock_initialized_sentry
 
+    def test_sentry_capture_exception_is_instance_attribute(self):
+        """Test that captureException and user_context bypass __getattr__."""
+        mock_app = MagicMock()
+        mock_app.config = {"EXCEPTION_LOG_TYPE": "FakeSentry"}
+
+        sentry = Sentry(mock_app)
+
+        assert "captureException" in vars(sentry)
+        assert "user_context" in vars(sentry)
+        # FakeSentry has neither at the top level, so both are no-ops
+        assert sentry.captureException(Exception("boom")) is None
+        assert sentry.user_context({"id": 1}) is None
+
+    def test_sentry_capture_exception_delegates_to_state(self):
+        """Test that captureException is taken from the state when it provides one."""
+        state = MagicMock()
+
+        with patch.object(Sentry, "init_app", return_value=state):
+            sentry = Sentry(MagicMock())
+
+        assert sentry.captureException is state.captureException
+        assert sentry.user_context is state.user_context
+
+    def test_sentry_creates_missing_extensions(self):
+        """Test that init_app creates the extensions dict when the app has none."""
+        mock_app = MagicMock(spec=["config"])
+        mock_app.config = {"EXCEPTION_LOG_TYPE": "FakeSentry"}
+
+        sentry = Sentry(mock_app)
+
+        assert mock_app.extensions == {"sentry": sentry.state}
+
     def test_sentry_getattr_delegation(self):
         """Test that Sentry.__getattr__ delegates to state."""
         mock_app = MagicMock()
-        mock_app.config.get.return_value = "FakeSentry"
+        mock_app.config = {"EXCEPTION_LOG_TYPE": "FakeSentry"}
 
         sentry = Sentry(mock_app)
 
@@ -142,17 +199,28 @@ class TestExceptionLogSentry:
         assert isinstance(sentry.client, FakeSentryClient)
 
     def test_sentry_getattr_none_state(self):
-        """Test that Sentry.__getattr__ returns None when state is None."""
+        """Test that Sentry.__getattr__ raises AttributeError when state is None."""
         sentry = Sentry()  # No app, so state is None
 
-        # Test that __getattr__ returns None when state is None
+        # client is resolved eagerly; anything else is an AttributeError without state
         assert sentry.client is None
-        assert sentry.some_nonexistent_attribute is None
+        with pytest.raises(AttributeError):
+            sentry.some_nonexistent_attribute
+
+    def test_sentry_client_is_instance_attribute(self):
+        """Test that client is resolved in __init__ rather than through __getattr__."""
+        mock_app = MagicMock()
+        mock_app.config = {"EXCEPTION_LOG_TYPE": "FakeSentry"}
+
+        sentry = Sentry(mock_app)
+
+        assert "client" in vars(sentry)
+        assert sentry.client is sentry.state.client
 
     def test_sentry_extensions_registration(self):
         """Test that Sentry extension is registered with app."""
         mock_app = MagicMock()
-        mock_app.config.get.return_value = "FakeSentry"
+        mock_app.config = {"EXCEPTION_LOG_TYPE": "FakeSentry"}
         mock_app.extensions = {}
 
         sentry = Sentry(mock_app)
@@ -164,12 +232,11 @@ class TestExceptionLogSentry:
     def test_sentry_initialization_without_flask_integration(self):
         """Test that Sentry initializes without any integrations."""
         mock_app = MagicMock()
-        mock_app.config.get.return_value = "Sentry"
-        mock_app.config.get.side_effect = lambda key, default=None: {
+        mock_app.config = {
             "EXCEPTION_LOG_TYPE": "Sentry",
             "SENTRY_DSN": "https://test@sentry.io/123",
             "SENTRY_ENVIRONMENT": "test",
-        }.get(key, default)
+        }
 
         with patch("util.saas.exceptionlog.sentry_sdk") as mock_sentry_sdk:
             # Mock the return value of sentry_sdk.init
@@ -198,7 +265,7 @@ class TestExceptionLogSentry:
     def test_sentry_extensions_existing(self):
         """Test that Sentry extension works with existing extensions."""
         mock_app = MagicMock()
-        mock_app.config.get.return_value = "FakeSentry"
+        mock_app.config = {"EXCEPTION_LOG_TYPE": "FakeSentry"}
         mock_app.extensions = {"existing": "extension"}
 
         sentry = Sentry(mock_app)
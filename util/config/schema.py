@@ -26,7 +26,11 @@ INTERNAL_ONLY_PROPERTIES = {
     "FEATURE_CLEAR_EXPIRED_RAC_ENTRIES",
     "FEATURE_IMAGE_PULL_STATS",
     "PULL_METRICS_WORKER_COUNT",
+    "PULL_METRICS_BATCH_SIZE",
+    "PULL_METRICS_FLUSH_INTERVAL_MS",
+    "PULL_METRICS_QUEUE_SIZE",
     "REDIS_FLUSH_INTERVAL_SECONDS",
+    "REDIS_FLUSH_WORKER_PROTOCOL",
     "ACTION_LOG_MAX_PAGE",
     "NON_RATE_LIMITED_NAMESPACES",
     "REPLICATION_QUEUE_NAME",
@@ -1,17 +1,29 @@
 import logging
+import queue
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime, timezone
 
 import redis
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_PULL_METRICS_WORKER_COUNT = 5
+DEFAULT_PULL_METRICS_BATCH_SIZE = 32
+DEFAULT_PULL_METRICS_FLUSH_INTERVAL_MS = 500
+DEFAULT_PULL_METRICS_QUEUE_SIZE = 10000
 DEFAULT_REDIS_CONNECTION_TIMEOUT = 5
 DEFAULT_REDIS_RETRY_ATTEMPTS = 3
 DEFAULT_REDIS_RETRY_DELAY = 1.0
 
+# Redis key formatters for pull events, bound once since they are called for every pull
+_format_tag_pull_key = "pull_events:repo:%s:tag:%s:%s".__mod__
+_format_manifest_pull_key = "pull_events:repo:%s:digest:%s".__mod__
+
+# Flag set with every pull event write and cleared by the flush worker when it starts a scan,
+# letting the worker skip scanning an idle keyspace. It deliberately does not match the
+# pull_events:* scan pattern.
+PULL_EVENTS_PENDING_KEY = "pull_events_pending"
+
 
 class CannotReadPullMetricsException(Exception):
     """
@@ -22,14 +34,40 @@ class CannotReadPullMetricsException(Exception):
 class PullMetricsBuilder(object):
     """
     Defines a helper class for constructing PullMetrics instances.
+
+    A single PullMetrics instance is shared by all callers, so that pull events from every
+    request feed the same batching queue and flusher thread.
     """
 
-    def __init__(self, redis_config, max_workers=None):
+    def __init__(
+        self,
+        redis_config,
+        max_workers=None,
+        batch_size=None,
+        flush_interval_ms=None,
+        queue_size=None,
+    ):
         self._redis_config = redis_config
         self._max_workers = max_workers
+        self._batch_size = batch_size
+        self._flush_interval_ms = flush_interval_ms
+        self._queue_size = queue_size
+        self._pull_metrics = None
+        self._lock = threading.Lock()
 
     def get_event(self):
-        return PullMetrics(self._redis_config, self._max_workers)
+        if self._pull_metrics is None:
+            with self._lock:
+                if self._pull_metrics is None:
+                    self._pull_metrics = PullMetrics(
+                        self._redis_config,
+                        self._max_workers,
+                        batch_size=self._batch_size,
+                        flush_interval_ms=self._flush_interval_ms,
+                        queue_size=self._queue_size,
+                    )
+
+        return self._pull_metrics
 
 
 class PullMetricsBuilderModule(object):
@@ -48,13 +86,20 @@ class PullMetricsBuilderModule(object):
                 "host": app.config.get("PULL_METRICS_REDIS_HOSTNAME"),
             }
 
-        # Add testing flag to redis config to disable thread pool during tests
+        # Add testing flag to redis config to disable the flusher thread during tests
         if app.config.get("TESTING", False):
             redis_config = redis_config.copy() if redis_config else {}
             redis_config["_testing"] = True
 
         max_workers = app.config.get("PULL_METRICS_WORKER_COUNT", DEFAULT_PULL_METRICS_WORKER_COUNT)
-        pull_metrics = PullMetricsBuilder(redis_config, max_workers)
+        batch_size = app.config.get("PULL_METRICS_BATCH_SIZE", DEFAULT_PULL_METRICS_BATCH_SIZE)
+        flush_interval_ms = app.config.get(
+            "PULL_METRICS_FLUSH_INTERVAL_MS", DEFAULT_PULL_METRICS_FLUSH_INTERVAL_MS
+        )
+        queue_size = app.config.get("PULL_METRICS_QUEUE_SIZE", DEFAULT_PULL_METRICS_QUEUE_SIZE)
+        pull_metrics = PullMetricsBuilder(
+            redis_config, max_workers, batch_size, flush_interval_ms, queue_size
+        )
 
         app.extensions = getattr(app, "extensions", {})
         app.extensions["pullmetrics"] = pull_metrics
@@ -75,8 +120,24 @@ class PullMetrics(object):
 
     Uses lazy initialization for Redis connection to handle cases where Redis
     may not be immediately available during application startup.
+
+    Outside of testing mode, pull events are placed on a bounded in-process queue and a
+    single flusher thread drains them in batches, writing each batch with one pipeline.
     """
 
+    # Queue marker telling the flusher thread to write what it has and exit
+    _STOP = object()
+
+    # Fields stored in each pull_events hash, read back with a single HMGET
+    _PULL_STATISTICS_FIELDS = (
+        "repository_id",
+        "tag_name",
+        "manifest_digest",
+        "pull_count",
+        "last_pull_timestamp",
+        "pull_method",
+    )
+
     # Lua script for atomic tag pull tracking
     _TRACK_TAG_PULL_SCRIPT = """
     local key = KEYS[1]
@@ -97,23 +158,18 @@ class PullMetrics(object):
         return redis.error_reply('Invalid input: timestamp must be positive number')
     end
 
-    local exists = redis.call('EXISTS', key)
-
-    if exists == 0 then
-        redis.call('HSET', key,
-            'repository_id', repo_id,
-            'tag_name', tag_name,
-            'manifest_digest', manifest_digest,
-            'pull_count', 1,
-            'last_pull_timestamp', timestamp,
-            'pull_method', pull_method
-        )
-    else
-        redis.call('HINCRBY', key, 'pull_count', 1)
-        redis.call('HSET', key, 'last_pull_timestamp', timestamp)
-    end
-
-    return redis.call('HGET', key, 'pull_count')
+    -- The identifying fields are fixed by the key, so rewriting them on every pull is
+    -- idempotent and avoids a separate existence check.
+    redis.call('HSET', key,
+        'repository_id', repo_id,
+        'tag_name', tag_name,
+        'manifest_digest', manifest_digest,
+        'last_pull_timestamp', timestamp,
+        'pull_method', pull_method
+    )
+    redis.call('SET', KEYS[2], '1')
+
+    return redis.call('HINCRBY', key, 'pull_count', 1)
     """
 
     # Lua script for atomic manifest pull tracking
@@ -135,26 +191,37 @@ class PullMetrics(object):
         return redis.error_reply('Invalid input: timestamp must be positive number')
     end
 
-    local exists = redis.call('EXISTS', key)
-
-    if exists == 0 then
-        redis.call('HSET', key,
-            'repository_id', repo_id,
-            'manifest_digest', manifest_digest,
-            'pull_count', 1,
-            'last_pull_timestamp', timestamp,
-            'pull_method', pull_method,
-            'tag_name', ''
-        )
-    else
-        redis.call('HINCRBY', key, 'pull_count', 1)
-        redis.call('HSET', key, 'last_pull_timestamp', timestamp)
-    end
+    -- The identifying fields are fixed by the key, so rewriting them on every pull is
+    -- idempotent and avoids a separate existence check.
+    redis.call('HSET', key,
+        'repository_id', repo_id,
+        'manifest_digest', manifest_digest,
+        'last_pull_timestamp', timestamp,
+        'pull_method', pull_method,
+        'tag_name', ''
+    )
+    redis.call('SET', KEYS[2], '1')
+
+    return redis.call('HINCRBY', key, 'pull_count', 1)
+    """
 
-    return redis.call('HGET', key, 'pull_count')
+    # Lua script writing one coalesced key from the flusher: HSET of its fields followed by
+    # HINCRBY of the pull count. ARGV[1] is the pull count, the rest are field/value pairs.
+    # KEYS[2] is the pending flag.
+    _WRITE_PULL_EVENT_SCRIPT = """
+    redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+    redis.call('SET', KEYS[2], '1')
+    return redis.call('HINCRBY', KEYS[1], 'pull_count', ARGV[1])
     """
 
-    def __init__(self, redis_config, max_workers=None):
+    def __init__(
+        self,
+        redis_config,
+        max_workers=None,
+        batch_size=None,
+        flush_interval_ms=None,
+        queue_size=None,
+    ):
         redis_config = (redis_config.copy() if redis_config else {}) or {}
 
         # Extract internal flags and connection settings (not passed to Redis)
@@ -170,12 +237,73 @@ class PullMetrics(object):
         self._redis_config = redis_config
         self._redis = None
 
-        # Initialize thread pool (skip in testing mode)
-        worker_count = max_workers or DEFAULT_PULL_METRICS_WORKER_COUNT
-        self._executor = (
-            None
-            if testing_mode
-            else ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="pullmetrics")
+        # Lua scripts, registered on first use; see _register_scripts
+        self._track_tag_pull_script = None
+        self._track_manifest_pull_script = None
+        self._write_pull_event_script = None
+
+        self._batch_size = batch_size or DEFAULT_PULL_METRICS_BATCH_SIZE
+        self._flush_interval = (
+            flush_interval_ms or DEFAULT_PULL_METRICS_FLUSH_INTERVAL_MS
+        ) / 1000.0
+        self._queue_size = queue_size or DEFAULT_PULL_METRICS_QUEUE_SIZE
+
+        # Share one connection pool between the flusher thread and statistics readers, so
+        # that a read never waits behind a batch write for a socket.
+        self._connection_pool = self._build_connection_pool(
+            max_workers or DEFAULT_PULL_METRICS_WORKER_COUNT
+        )
+
+        # Initialize batching queue and flusher thread (skip in testing mode)
+        self._shutdown = False
+        self._queue = None
+        self._flusher_thread = None
+        if not testing_mode:
+            self._queue = queue.Queue(maxsize=self._queue_size)
+            self._flusher_thread = threading.Thread(
+                target=self._flush_loop, name="pullmetrics-flusher", daemon=True
+            )
+            self._flusher_thread.start()
+
+    def _register_scripts(self, redis_client):
+        """
+        Register the Lua scripts once, on the first client that runs one.
+
+        Registered scripts are called with EVALSHA, so the script body is only sent to Redis
+        when the server does not already have it cached, instead of on every call. Each call
+        passes the current client, so the scripts outlive reconnects.
+        """
+        if self._write_pull_event_script is not None:
+            return
+
+        self._track_tag_pull_script = redis_client.register_script(self._TRACK_TAG_PULL_SCRIPT)
+        self._track_manifest_pull_script = redis_client.register_script(
+            self._TRACK_MANIFEST_PULL_SCRIPT
+        )
+        self._write_pull_event_script = redis_client.register_script(self._WRITE_PULL_EVENT_SCRIPT)
+
+    def _build_connection_pool(self, max_connections):
+        """
+        Build a blocking connection pool from the Redis connection parameters.
+
+        Callers wait up to the connection timeout for a free connection instead of
+        failing outright when the pool is exhausted.
+
+        Responses are always decoded to str by the parser; the read and write paths rely on
+        it and never decode bytes themselves, so a decode_responses setting in the
+        configuration is overridden.
+        """
+        connection_kwargs = dict(self._redis_config)
+        if connection_kwargs.pop("ssl", False):
+            connection_kwargs["connection_class"] = redis.SSLConnection
+        connection_kwargs["decode_responses"] = True
+
+        return redis.BlockingConnectionPool(
+            max_connections=max_connections,
+            timeout=self._connection_timeout,
+            socket_connect_timeout=self._connection_timeout,
+            socket_timeout=self._socket_timeout,
+            **connection_kwargs,
         )
 
     def _ensure_redis_connection(self):
@@ -203,11 +331,7 @@ class PullMetrics(object):
         last_exception = None
         for attempt in range(1, self._retry_attempts + 1):
             try:
-                self._redis = redis.StrictRedis(
-                    socket_connect_timeout=self._connection_timeout,
-                    socket_timeout=self._socket_timeout,
-                    **self._redis_config,
-                )
+                self._redis = redis.StrictRedis(connection_pool=self._connection_pool)
                 self._redis.ping()
                 if attempt > 1:
                     logger.info(
@@ -245,7 +369,7 @@ class PullMetrics(object):
 
         Note: Uses repository_id for consistent key naming.
         """
-        return "pull_events:repo:%s:tag:%s:%s" % (repository_id, tag_name, manifest_digest)
+        return _format_tag_pull_key((repository_id, tag_name, manifest_digest))
 
     @staticmethod
     def _manifest_pull_key(repository_id, manifest_digest):
@@ -256,7 +380,7 @@ class PullMetrics(object):
 
         Note: Uses repository_id for consistent key naming.
         """
-        return "pull_events:repo:%s:digest:%s" % (repository_id, manifest_digest)
+        return _format_manifest_pull_key((repository_id, manifest_digest))
 
     def track_tag_pull_sync(self, repository_ref, tag_name, manifest_digest):
         """
@@ -273,20 +397,25 @@ class PullMetrics(object):
         # Get repository_id if object is passed
         repository_id = repository_ref.id if hasattr(repository_ref, "id") else repository_ref
 
-        timestamp = int(datetime.now(timezone.utc).timestamp())
+        timestamp = int(time.time())
 
         tag_key = self._tag_pull_key(repository_id, tag_name, manifest_digest)
 
         try:
-            pull_count = redis_client.eval(
-                self._TRACK_TAG_PULL_SCRIPT,
-                1,  # number of keys
-                tag_key,  # KEYS[1]
-                str(repository_id),  # ARGV[1]
-                tag_name,  # ARGV[2]
-                manifest_digest,  # ARGV[3]
-                str(timestamp),  # ARGV[4]
-                "tag",  # ARGV[5]
+            self._register_scripts(redis_client)
+            pull_count = self._track_tag_pull_script(
+                keys=[
+                    tag_key,  # KEYS[1]
+                    PULL_EVENTS_PENDING_KEY,  # KEYS[2]
+                ],
+                args=[
+                    str(repository_id),  # ARGV[1]
+                    tag_name,  # ARGV[2]
+                    manifest_digest,  # ARGV[3]
+                    str(timestamp),  # ARGV[4]
+                    "tag",  # ARGV[5]
+                ],
+                client=redis_client,
             )
 
             logger.debug(
@@ -318,8 +447,20 @@ class PullMetrics(object):
         """
         Track a tag pull event.
 
-        Note that this occurs in a thread to prevent blocking.
+        Note that this only enqueues the event; it is written to Redis by the flusher thread.
         """
+        if self._queue is not None:
+            repository_id = repository.id if hasattr(repository, "id") else repository
+            self._enqueue(
+                self._tag_pull_key(repository_id, tag_name, manifest_digest),
+                {
+                    "repository_id": str(repository_id),
+                    "tag_name": tag_name,
+                    "manifest_digest": manifest_digest,
+                    "pull_method": "tag",
+                },
+            )
+            return
 
         def conduct():
             try:
@@ -335,11 +476,8 @@ class PullMetrics(object):
             except Exception as e:
                 logger.exception("Unexpected error tracking tag pull metrics: %s", e)
 
-        if self._executor:
-            self._executor.submit(conduct)
-        else:
-            # During tests, run synchronously to avoid thread interference
-            conduct()
+        # During tests, run synchronously to avoid thread interference
+        conduct()
 
     def track_manifest_pull_sync(self, repository_ref, manifest_digest):
         """
@@ -355,19 +493,24 @@ class PullMetrics(object):
         # Get repository_id if object is passed
         repository_id = repository_ref.id if hasattr(repository_ref, "id") else repository_ref
 
-        timestamp = int(datetime.now(timezone.utc).timestamp())
+        timestamp = int(time.time())
 
         manifest_key = self._manifest_pull_key(repository_id, manifest_digest)
 
         try:
-            pull_count = redis_client.eval(
-                self._TRACK_MANIFEST_PULL_SCRIPT,
-                1,  # number of keys
-                manifest_key,  # KEYS[1]
-                str(repository_id),  # ARGV[1]
-                manifest_digest,  # ARGV[2]
-                str(timestamp),  # ARGV[3]
-                "digest",  # ARGV[4]
+            self._register_scripts(redis_client)
+            pull_count = self._track_manifest_pull_script(
+                keys=[
+                    manifest_key,  # KEYS[1]
+                    PULL_EVENTS_PENDING_KEY,  # KEYS[2]
+                ],
+                args=[
+                    str(repository_id),  # ARGV[1]
+                    manifest_digest,  # ARGV[2]
+                    str(timestamp),  # ARGV[3]
+                    "digest",  # ARGV[4]
+                ],
+                client=redis_client,
             )
 
             logger.debug(
@@ -398,8 +541,20 @@ class PullMetrics(object):
         """
         Track a manifest pull event.
 
-        Note that this occurs in a thread to prevent blocking.
+        Note that this only enqueues the event; it is written to Redis by the flusher thread.
         """
+        if self._queue is not None:
+            repository_id = repository.id if hasattr(repository, "id") else repository
+            self._enqueue(
+                self._manifest_pull_key(repository_id, manifest_digest),
+                {
+                    "repository_id": str(repository_id),
+                    "tag_name": "",
+                    "manifest_digest": manifest_digest,
+                    "pull_method": "digest",
+                },
+            )
+            return
 
         def conduct():
             try:
@@ -415,11 +570,134 @@ class PullMetrics(object):
             except Exception as e:
                 logger.exception("Unexpected error tracking manifest pull metrics: %s", e)
 
-        if self._executor:
-            self._executor.submit(conduct)
-        else:
-            # During tests, run synchronously to avoid thread interference
-            conduct()
+        # During tests, run synchronously to avoid thread interference
+        conduct()
+
+    def _enqueue(self, key, fields):
+        """
+        Place a pull event on the batching queue without blocking the caller.
+
+        Pull metrics are best-effort, so the event is dropped if the queue is full.
+        """
+        try:
+            self._queue.put_nowait((key, fields))
+        except queue.Full:
+            logger.warning("Pull metrics queue is full; dropping pull event for %s", key)
+
+    def _drain_queue(self):
+        """
+        Collect the next batch of pull events from the queue.
+
+        Blocks until an event is available, then keeps collecting until the batch is full or
+        the flush interval has elapsed.
+
+        Returns:
+            tuple: (list of events, whether the stop marker was received)
+        """
+        event = self._queue.get()
+        if event is self._STOP:
+            return [], True
+
+        batch = [event]
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                event = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            if event is self._STOP:
+                return batch, True
+
+            batch.append(event)
+
+        return batch, False
+
+    def _flush_loop(self):
+        """
+        Body of the flusher thread: drain the queue into batches and write each to Redis.
+        """
+        while True:
+            batch, stopping = self._drain_queue()
+            if batch:
+                # Events within a batch are at most one flush interval apart, so a single
+                # timestamp taken at drain time stands in for all of them.
+                self._write_batch(batch, int(time.time()))
+
+            if stopping:
+                return
+
+    @staticmethod
+    def _coalesce_batch(batch):
+        """
+        Merge repeated pulls of the same key within a batch.
+
+        The identifying fields are fixed by the key, so only the pull count differs
+        between repeated events.
+
+        Returns:
+            dict: key -> (fields, number of pulls)
+        """
+        coalesced = {}
+        for key, fields in batch:
+            existing = coalesced.get(key)
+            coalesced[key] = (fields, existing[1] + 1 if existing is not None else 1)
+
+        return coalesced
+
+    def _write_batch(self, batch, timestamp):
+        """
+        Write a batch of pull events to Redis using a single pipeline.
+
+        Repeated pulls of the same key are coalesced first, so the pipeline holds one
+        HSET/HINCRBY pair per distinct key rather than per event. The pipeline is
+        transactional so that the flush worker's RENAME never observes a hash with only
+        some of an event's fields written.
+
+        A batch that coalesces to a single key skips the pipeline and is written with one
+        script call, which is atomic on its own.
+        """
+        try:
+            coalesced = self._coalesce_batch(batch)
+            redis_client = self._ensure_redis_connection()
+            if len(coalesced) == 1:
+                ((key, (fields, count)),) = coalesced.items()
+                field_values = []
+                for field, value in fields.items():
+                    field_values.extend((field, value))
+
+                self._register_scripts(redis_client)
+                self._write_pull_event_script(
+                    keys=[key, PULL_EVENTS_PENDING_KEY],
+                    args=[count, *field_values, "last_pull_timestamp", timestamp],
+                    client=redis_client,
+                )
+            else:
+                pipe = redis_client.pipeline()
+                for key, (fields, count) in coalesced.items():
+                    pipe.hset(key, mapping={**fields, "last_pull_timestamp": timestamp})
+                    pipe.hincrby(key, "pull_count", count)
+                pipe.set(PULL_EVENTS_PENDING_KEY, 1)
+                pipe.execute()
+
+            logger.debug(
+                "Flushed %d pull events (%d distinct keys) to Redis", len(batch), len(coalesced)
+            )
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            logger.warning(
+                "Could not flush %d pull events (connection error): %s. "
+                "Pull statistics may not be recorded until Redis is available.",
+                len(batch),
+                str(e),
+            )
+        except redis.RedisError as e:
+            logger.error("Could not flush %d pull events (Redis error): %s", len(batch), str(e))
+        except Exception as e:
+            logger.exception("Unexpected error flushing pull events: %s", e)
 
     def _get_pull_statistics(self, key):
         """
@@ -427,30 +705,64 @@ class PullMetrics(object):
         """
         try:
             redis_client = self._ensure_redis_connection()
-            data = redis_client.hgetall(key)
-            if not data:
-                return None
+            values = redis_client.hmget(key, self._PULL_STATISTICS_FIELDS)
+            return self._parse_pull_statistics(values)
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            logger.warning("Could not get pull statistics (connection error): %s", str(e))
+            return None
+        except redis.RedisError as e:
+            logger.warning("Could not get pull statistics (Redis error): %s", str(e))
+            return None
 
-            # Convert bytes to strings and integers
-            result = {}
-            for key, value in data.items():
-                if isinstance(key, bytes):
-                    key = key.decode("utf-8")
-                if isinstance(value, bytes):
-                    value = value.decode("utf-8")
+    def get_pull_statistics_bulk(self, keys):
+        """
+        Get pull statistics for many Redis keys in a single round trip.
 
-                if key in ["pull_count"]:
-                    result[key] = int(value) if value else 0
-                else:
-                    result[key] = value
+        Args:
+            keys: Pull event keys, as built by _tag_pull_key / _manifest_pull_key
 
-            return result
+        Returns:
+            list: Statistics dict (or None if the key does not exist) for each key, in order
+        """
+        if not keys:
+            return []
+
+        try:
+            redis_client = self._ensure_redis_connection()
+            pipe = redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hmget(key, self._PULL_STATISTICS_FIELDS)
+
+            return [self._parse_pull_statistics(values) for values in pipe.execute()]
         except (redis.ConnectionError, redis.TimeoutError) as e:
             logger.warning("Could not get pull statistics (connection error): %s", str(e))
-            return None
+            return [None] * len(keys)
         except redis.RedisError as e:
             logger.warning("Could not get pull statistics (Redis error): %s", str(e))
-            return None
+            return [None] * len(keys)
+
+    @classmethod
+    def _parse_pull_statistics(cls, values):
+        """
+        Build a statistics dict from an HMGET reply, or None if the hash does not exist.
+        """
+        # Responses are already decoded by the client. Hashes written by the tracker carry
+        # every field, so the common case is a straight zip; otherwise drop absent fields.
+        if None not in values:
+            result = dict(zip(cls._PULL_STATISTICS_FIELDS, values))
+        else:
+            result = {
+                field: value
+                for field, value in zip(cls._PULL_STATISTICS_FIELDS, values)
+                if value is not None
+            }
+            if not result:
+                return None
+
+        if "pull_count" in result:
+            result["pull_count"] = int(result["pull_count"]) if result["pull_count"] else 0
+
+        return result
 
     def get_tag_pull_statistics(self, repository_id, tag_name, manifest_digest):
         """
@@ -480,8 +792,8 @@ class PullMetrics(object):
 
     def shutdown(self):
         """
-        Shutdown the thread pool executor.
-        Following codebase patterns (similar to buildman/server.py server.stop(grace=5))
+        Stop the flusher thread after it has written any queued events. Calling this
+        more than once is a no-op.
 
         Note: This method is not currently called during application shutdown,
         which means pending tasks may be lost during shutdown. This is a known
@@ -490,5 +802,10 @@ class PullMetrics(object):
         TODO: Integrate with a centralized shutdown mechanism when available.
         See PR review comments for context.
         """
-        if self._executor:
-            self._executor.shutdown(wait=True)
+        if self._shutdown:
+            return
+        self._shutdown = True
+
+        if self._flusher_thread is not None:
+            self._queue.put(self._STOP)
+            self._flusher_thread.join()
@@ -2,16 +2,32 @@ import logging
 import re
 from typing import Any, Optional
 
-import sentry_sdk
-from sentry_sdk.integrations.flask import FlaskIntegration
-from sentry_sdk.integrations.logging import LoggingIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
-from sentry_sdk.integrations.stdlib import StdlibIntegration
-
 # Note: Imported inside functions to avoid circular imports where possible
 
 logger = logging.getLogger(__name__)
 
+# The Sentry SDK is only imported once Sentry is actually configured; see _try_import_sentry.
+sentry_sdk: Any = None
+
+
+def _try_import_sentry():
+    """
+    Import the Sentry SDK on first use and return it, or None if it is not installed.
+
+    FakeSentry deployments never call this, so they never load the SDK.
+    """
+    global sentry_sdk
+    if sentry_sdk is None:
+        try:
+            import sentry_sdk as _sentry_sdk
+        except ImportError:
+            return None
+
+        sentry_sdk = _sentry_sdk
+
+    return sentry_sdk
+
+
 # patterns to NEVER exclude
 IMPORTANT_PATTERNS = [
     "database",
@@ -284,6 +300,10 @@ def _sentry_before_send_ignore_known(ex_event: Any, hint: Any) -> Optional[Any]:
 import features
 
 
+def _noop(*args, **kwargs):
+    pass
+
+
 class FakeSentryClient(object):
     def captureException(self, *args, **kwargs):
         pass
@@ -305,6 +325,11 @@ class Sentry(object):
         else:
             self.state = None
 
+        # Resolve hot attributes once so that lookups do not fall through to __getattr__
+        self.client = getattr(self.state, "client", None)
+        self.captureException = getattr(self.state, "captureException", None) or _noop
+        self.user_context = getattr(self.state, "user_context", None) or _noop
+
     def init_app(self, app):
         sentry_type = app.config.get("EXCEPTION_LOG_TYPE", "FakeSentry")
 
@@ -314,6 +339,17 @@ class Sentry(object):
                 try:
                     logger.info("Initializing Sentry with DSN: %s...", sentry_dsn[:10])
 
+                    sdk = _try_import_sentry()
+                    if sdk is None:
+                        raise ImportError("sentry_sdk is not installed")
+
+                    from sentry_sdk.integrations.flask import FlaskIntegration
+                    from sentry_sdk.integrations.logging import LoggingIntegration
+                    from sentry_sdk.integrations.sqlalchemy import (
+                        SqlalchemyIntegration,
+                    )
+                    from sentry_sdk.integrations.stdlib import StdlibIntegration
+
                     integrations = []
 
                     # Always include logging integration
@@ -338,7 +374,7 @@ class Sentry(object):
                         # When OTEL is enabled, use minimal integrations to avoid conflicts
                         logger.info("OpenTelemetry enabled - using minimal Sentry integrations")
 
-                    initialized_sentry = sentry_sdk.init(
+                    initialized_sentry = sdk.init(
                         dsn=sentry_dsn,
                         environment=app.config.get("SENTRY_ENVIRONMENT", "production"),
                         traces_sample_rate=app.config.get("SENTRY_TRACES_SAMPLE_RATE", 0.1),
@@ -363,11 +399,14 @@ class Sentry(object):
             sentry = FakeSentry()
 
         # register extension with app
-        app.extensions = getattr(app, "extensions", {})
+        if not hasattr(app, "extensions"):
+            app.extensions = {}
         app.extensions["sentry"] = sentry
         return sentry
 
     def __getattr__(self, name):
-        if self.state is None:
-            return None
-        return getattr(self.state, name, None)
+        # Read state from __dict__ so a lookup before it is assigned cannot recurse
+        state = self.__dict__.get("state")
+        if state is None:
+            raise AttributeError(name)
+        return getattr(state, name, None)
@@ -10,13 +10,20 @@ This test suite covers:
 - Error handling
 """
 
+import hashlib
+import queue
 from datetime import datetime, timezone
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import ANY, MagicMock, Mock, patch
 
+import fakeredis
 import pytest
 import redis
+from redis.commands.core import Script
+from redis.connection import Encoder
 
 from util.pullmetrics import (
+    DEFAULT_PULL_METRICS_WORKER_COUNT,
+    PULL_EVENTS_PENDING_KEY,
     CannotReadPullMetricsException,
     PullMetrics,
     PullMetricsBuilder,
@@ -68,6 +75,16 @@ class TestPullMetricsBuilder:
             event = builder.get_event()
             assert isinstance(event, PullMetrics)
 
+    def test_builder_get_event_returns_shared_instance(self, mock_redis):
+        """Test PullMetricsBuilder.get_event() reuses a single PullMetrics instance."""
+        redis_config = {"host": "localhost", "port": 6379, "_testing": True}
+        builder = PullMetricsBuilder(redis_config, batch_size=8, flush_interval_ms=100)
+
+        event = builder.get_event()
+        assert builder.get_event() is event
+        assert event._batch_size == 8
+        assert event._flush_interval == 0.1
+
 
 class TestPullMetricsBuilderModule:
     """Test PullMetricsBuilderModule Flask extension."""
@@ -139,6 +156,22 @@ class TestPullMetricsBuilderModule:
 
         assert builder._max_workers == 10
 
+    def test_module_init_app_with_custom_queue_size(self, mock_redis):
+        """Test module passes the configured queue size through to the pending event queue."""
+        app = Mock()
+        app.config = {
+            "PULL_METRICS_REDIS": {"host": "localhost", "port": 6379},
+            "PULL_METRICS_QUEUE_SIZE": 50,
+        }
+        app.extensions = {}
+
+        builder = PullMetricsBuilderModule().init_app(app)
+        pm = builder.get_event()
+        try:
+            assert pm._queue.maxsize == 50
+        finally:
+            pm.shutdown()
+
     def test_module_bool_true_when_initialized(self):
         """Test that PullMetricsBuilderModule is truthy when state is initialized."""
         app = Mock()
@@ -170,26 +203,50 @@ class TestPullMetricsBuilderModule:
         assert module._redis_config is not None
 
 
+def _script_sha(script):
+    """SHA1 digest EVALSHA uses to refer to a Lua script."""
+    return hashlib.sha1(script.encode("utf-8")).hexdigest()
+
+
 @pytest.fixture
 def mock_redis():
     """Create a mock Redis client."""
     with patch("util.pullmetrics.redis.StrictRedis") as mock_redis_class:
         mock_redis_instance = MagicMock()
+        # Registered scripts are real, so calling one issues EVALSHA on the mock
+        mock_redis_instance.get_encoder.return_value = Encoder("utf-8", "strict", True)
+        mock_redis_instance.register_script.side_effect = lambda script: Script(
+            mock_redis_instance, script
+        )
         mock_redis_class.return_value = mock_redis_instance
         yield mock_redis_instance
 
 
 @pytest.fixture
-def pull_metrics_testing(mock_redis):
-    """Create PullMetrics instance in testing mode (no thread pool)."""
-    redis_config = {"host": "localhost", "port": 6379, "_testing": True}
-    return PullMetrics(redis_config)
+def fake_redis():
+    """In-memory Redis server that runs the tracking Lua scripts for real."""
+    return fakeredis.FakeStrictRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+
+@pytest.fixture
+def pull_metrics_fake_redis(fake_redis):
+    """Create PullMetrics instance in testing mode backed by fakeredis."""
+    with patch("util.pullmetrics.redis.StrictRedis", return_value=fake_redis):
+        yield PullMetrics({"host": "localhost", "port": 6379, "_testing": True})
 
 
 @pytest.fixture
 def pull_metrics_production(mock_redis):
-    """Create PullMetrics instance in production mode (with thread pool)."""
-    redis_config = {"host": "localhost", "port": 6379}
+    """Create PullMetrics instance in production mode, shutting its flusher thread down after."""
+    pm = PullMetrics({"host": "localhost", "port": 6379})
+    yield pm
+    pm.shutdown()
+
+
+@pytest.fixture
+def pull_metrics_testing(mock_redis):
+    """Create PullMetrics instance in testing mode (no flusher thread)."""
+    redis_config = {"host": "localhost", "port": 6379, "_testing": True}
     return PullMetrics(redis_config)
 
 
@@ -203,16 +260,46 @@ class TestPullMetrics:
 
         # With lazy initialization, Redis connection should be None until first use
         assert pm._redis is None
-        assert pm._executor is None  # No thread pool in testing mode
+        assert pm._flusher_thread is None  # No flusher thread in testing mode
 
-    def test_pullmetrics_initialization_production_mode(self, mock_redis):
+    def test_pullmetrics_initialization_production_mode(self, pull_metrics_production):
         """Test PullMetrics initialization in production mode - lazy connection."""
-        redis_config = {"host": "localhost", "port": 6379}
-        pm = PullMetrics(redis_config)
+        pm = pull_metrics_production
 
         # With lazy initialization, Redis connection should be None until first use
         assert pm._redis is None
-        assert pm._executor is not None  # Thread pool in production mode
+        assert pm._flusher_thread is not None  # Flusher thread in production mode
+        assert pm._flusher_thread.is_alive()
+
+        pm.shutdown()
+        assert not pm._flusher_thread.is_alive()
+
+    def test_connection_pool_sized_to_worker_count(self, mock_redis):
+        """Test that the shared connection pool has one connection per worker thread."""
+        redis_config = {"host": "localhost", "port": 6379, "db": 1, "_testing": True}
+        pm = PullMetrics(redis_config, max_workers=7)
+
+        assert isinstance(pm._connection_pool, redis.BlockingConnectionPool)
+        assert pm._connection_pool.max_connections == 7
+        assert pm._connection_pool.connection_kwargs["host"] == "localhost"
+        assert pm._connection_pool.connection_kwargs["db"] == 1
+
+    def test_connection_pool_default_size(self, pull_metrics_testing):
+        """Test that the connection pool defaults to the default worker count."""
+        assert (
+            pull_metrics_testing._connection_pool.max_connections
+            == DEFAULT_PULL_METRICS_WORKER_COUNT
+        )
+
+    def test_connection_pool_passed_to_client(self, pull_metrics_testing, mock_redis):
+        """Test that the Redis client is built on the shared connection pool."""
+        pull_metrics_testing._ensure_redis_connection()
+
+        from util.pullmetrics import redis as pullmetrics_redis
+
+        pullmetrics_redis.StrictRedis.assert_called_with(
+            connection_pool=pull_metrics_testing._connection_pool
+        )
 
     def test_lazy_redis_connection_on_first_use(self, mock_redis):
         """Test that Redis connection is established on first use, not during init."""
@@ -343,24 +430,123 @@ class TestPullMetrics:
 
         # Mock connection establishment (ping) and Lua script execution
         mock_redis.ping.return_value = True
-        mock_redis.eval.return_value = "1"  # Return pull_count as string
+        mock_redis.evalsha.return_value = "1"  # Return pull_count as string
 
         # Execute
         pull_metrics_testing.track_tag_pull_sync(repository, tag_name, manifest_digest)
 
         # Verify Redis connection was established (ping called)
         assert mock_redis.ping.called
-        # Verify Lua script was called with correct arguments
-        mock_redis.eval.assert_called_once()
-        call_args = mock_redis.eval.call_args
-        assert call_args[0][0] == pull_metrics_testing._TRACK_TAG_PULL_SCRIPT
-        assert call_args[0][1] == 1  # number of keys
+        # Verify the registered Lua script was called with correct arguments
+        mock_redis.evalsha.assert_called_once()
+        call_args = mock_redis.evalsha.call_args
+        assert call_args[0][0] == _script_sha(PullMetrics._TRACK_TAG_PULL_SCRIPT)
+        assert call_args[0][1] == 2  # number of keys
         assert call_args[0][2] == "pull_events:repo:123:tag:latest:sha256:abc123"  # KEYS[1]
-        assert call_args[0][3] == "123"  # ARGV[1] - repository_id
-        assert call_args[0][4] == "latest"  # ARGV[2] - tag_name
-        assert call_args[0][5] == "sha256:abc123"  # ARGV[3] - manifest_digest
+        assert call_args[0][3] == PULL_EVENTS_PENDING_KEY  # KEYS[2]
+        assert call_args[0][4] == "123"  # ARGV[1] - repository_id
+        assert call_args[0][5] == "latest"  # ARGV[2] - tag_name
+        assert call_args[0][6] == "sha256:abc123"  # ARGV[3] - manifest_digest
         # ARGV[4] is timestamp (dynamic, skip check)
-        assert call_args[0][7] == "tag"  # ARGV[5] - pull_method
+        assert call_args[0][8] == "tag"  # ARGV[5] - pull_method
+
+    def test_track_tag_pull_script_writes_hash(self, pull_metrics_fake_redis, fake_redis):
+        """Test the tag script records the pull and only refreshes the count and timestamp."""
+        key = "pull_events:repo:123:tag:latest:sha256:abc123"
+
+        with patch("util.pullmetrics.time.time", return_value=1700000000):
+            pull_metrics_fake_redis.track_tag_pull_sync(123, "latest", "sha256:abc123")
+
+        assert fake_redis.hgetall(key) == {
+            "repository_id": "123",
+            "tag_name": "latest",
+            "manifest_digest": "sha256:abc123",
+            "pull_count": "1",
+            "last_pull_timestamp": "1700000000",
+            "pull_method": "tag",
+        }
+        assert fake_redis.get(PULL_EVENTS_PENDING_KEY) == "1"
+
+        with patch("util.pullmetrics.time.time", return_value=1700000060):
+            pull_metrics_fake_redis.track_tag_pull_sync(123, "latest", "sha256:abc123")
+            pull_metrics_fake_redis.track_tag_pull_sync(123, "latest", "sha256:abc123")
+
+        assert fake_redis.hgetall(key) == {
+            "repository_id": "123",
+            "tag_name": "latest",
+            "manifest_digest": "sha256:abc123",
+            "pull_count": "3",
+            "last_pull_timestamp": "1700000060",
+            "pull_method": "tag",
+        }
+
+    def test_track_manifest_pull_script_writes_hash(self, pull_metrics_fake_redis, fake_redis):
+        """Test the manifest script records the pull and only refreshes the count and timestamp."""
+        key = "pull_events:repo:789:digest:sha256:xyz789"
+
+        with patch("util.pullmetrics.time.time", return_value=1700000000):
+            pull_metrics_fake_redis.track_manifest_pull_sync(789, "sha256:xyz789")
+
+        assert fake_redis.hgetall(key) == {
+            "repository_id": "789",
+            "tag_name": "",
+            "manifest_digest": "sha256:xyz789",
+            "pull_count": "1",
+            "last_pull_timestamp": "1700000000",
+            "pull_method": "digest",
+        }
+        assert fake_redis.get(PULL_EVENTS_PENDING_KEY) == "1"
+
+        with patch("util.pullmetrics.time.time", return_value=1700000060):
+            pull_metrics_fake_redis.track_manifest_pull_sync(789, "sha256:xyz789")
+
+        assert fake_redis.hgetall(key) == {
+            "repository_id": "789",
+            "tag_name": "",
+            "manifest_digest": "sha256:xyz789",
+            "pull_count": "2",
+            "last_pull_timestamp": "1700000060",
+            "pull_method": "digest",
+        }
+
+    def test_track_pull_scripts_use_evalsha(self, pull_metrics_fake_redis, fake_redis):
+        """Test the tracking scripts are loaded once and then run by SHA instead of source."""
+        with (
+            patch.object(fake_redis, "eval", wraps=fake_redis.eval) as mock_eval,
+            patch.object(
+                fake_redis, "script_load", wraps=fake_redis.script_load
+            ) as mock_script_load,
+        ):
+            for _ in range(3):
+                pull_metrics_fake_redis.track_tag_pull_sync(123, "latest", "sha256:abc123")
+                pull_metrics_fake_redis.track_manifest_pull_sync(123, "sha256:abc123")
+
+        mock_eval.assert_not_called()
+        assert [call.args[0] for call in mock_script_load.call_args_list] == [
+            PullMetrics._TRACK_TAG_PULL_SCRIPT,
+            PullMetrics._TRACK_MANIFEST_PULL_SCRIPT,
+        ]
+        assert fake_redis.hget("pull_events:repo:123:digest:sha256:abc123", "pull_count") == "3"
+
+    def test_track_pull_scripts_keep_tag_and_manifest_keys_apart(
+        self, pull_metrics_fake_redis, fake_redis
+    ):
+        """Test a manifest pull does not touch the hash of a tag pull of the same digest."""
+        pull_metrics_fake_redis.track_tag_pull_sync(123, "latest", "sha256:abc123")
+        pull_metrics_fake_redis.track_manifest_pull_sync(123, "sha256:abc123")
+
+        tag_key = "pull_events:repo:123:tag:latest:sha256:abc123"
+        manifest_key = "pull_events:repo:123:digest:sha256:abc123"
+        assert fake_redis.hmget(tag_key, "tag_name", "pull_count", "pull_method") == [
+            "latest",
+            "1",
+            "tag",
+        ]
+        assert fake_redis.hmget(manifest_key, "tag_name", "pull_count", "pull_method") == [
+            "",
+            "1",
+            "digest",
+        ]
 
     def test_track_tag_pull_sync_with_repository_id(self, pull_metrics_testing, mock_redis):
         """Test synchronous tag pull tracking with repository ID instead of object."""
@@ -370,15 +556,15 @@ class TestPullMetrics:
         manifest_digest = "sha256:def456"
 
         # Mock Lua script execution
-        mock_redis.eval.return_value = "1"  # Return pull_count as string
+        mock_redis.evalsha.return_value = "1"  # Return pull_count as string
 
         # Execute
         pull_metrics_testing.track_tag_pull_sync(repository_id, tag_name, manifest_digest)
 
-        # Verify Lua script was called with correct repository_id
-        mock_redis.eval.assert_called_once()
-        call_args = mock_redis.eval.call_args
-        assert call_args[0][3] == "456"  # ARGV[1] - repository_id as string
+        # Verify the registered Lua script was called with correct repository_id
+        mock_redis.evalsha.assert_called_once()
+        call_args = mock_redis.evalsha.call_args
+        assert call_args[0][4] == "456"  # ARGV[1] - repository_id as string
 
     def test_track_manifest_pull_sync(self, pull_metrics_testing, mock_redis):
         """Test synchronous manifest pull tracking."""
@@ -388,21 +574,22 @@ class TestPullMetrics:
         manifest_digest = "sha256:xyz789"
 
         # Mock Lua script execution
-        mock_redis.eval.return_value = "1"  # Return pull_count as string
+        mock_redis.evalsha.return_value = "1"  # Return pull_count as string
 
         # Execute
         pull_metrics_testing.track_manifest_pull_sync(repository, manifest_digest)
 
-        # Verify Lua script was called with correct arguments
-        mock_redis.eval.assert_called_once()
-        call_args = mock_redis.eval.call_args
-        assert call_args[0][0] == pull_metrics_testing._TRACK_MANIFEST_PULL_SCRIPT
-        assert call_args[0][1] == 1  # number of keys
+        # Verify the registered Lua script was called with correct arguments
+        mock_redis.evalsha.assert_called_once()
+        call_args = mock_redis.evalsha.call_args
+        assert call_args[0][0] == _script_sha(PullMetrics._TRACK_MANIFEST_PULL_SCRIPT)
+        assert call_args[0][1] == 2  # number of keys
         assert call_args[0][2] == "pull_events:repo:789:digest:sha256:xyz789"  # KEYS[1]
-        assert call_args[0][3] == "789"  # ARGV[1] - repository_id
-        assert call_args[0][4] == "sha256:xyz789"  # ARGV[2] - manifest_digest
+        assert call_args[0][3] == PULL_EVENTS_PENDING_KEY  # KEYS[2]
+        assert call_args[0][4] == "789"  # ARGV[1] - repository_id
+        assert call_args[0][5] == "sha256:xyz789"  # ARGV[2] - manifest_digest
         # ARGV[3] is timestamp (dynamic, skip check)
-        assert call_args[0][6] == "digest"  # ARGV[4] - pull_method
+        assert call_args[0][7] == "digest"  # ARGV[4] - pull_method
 
     def test_track_manifest_pull_sync_with_repository_id(self, pull_metrics_testing, mock_redis):
         """Test synchronous manifest pull tracking with repository ID."""
@@ -411,15 +598,15 @@ class TestPullMetrics:
         manifest_digest = "sha256:test999"
 
         # Mock Lua script execution
-        mock_redis.eval.return_value = "1"  # Return pull_count as string
+        mock_redis.evalsha.return_value = "1"  # Return pull_count as string
 
         # Execute
         pull_metrics_testing.track_manifest_pull_sync(repository_id, manifest_digest)
 
-        # Verify Lua script was called with correct repository_id
-        mock_redis.eval.assert_called_once()
-        call_args = mock_redis.eval.call_args
-        assert call_args[0][3] == "999"  # ARGV[1] - repository_id as string
+        # Verify the registered Lua script was called with correct repository_id
+        mock_redis.evalsha.assert_called_once()
+        call_args = mock_redis.evalsha.call_args
+        assert call_args[0][4] == "999"  # ARGV[1] - repository_id as string
 
     def test_track_tag_pull_async_testing_mode(self, pull_metrics_testing, mock_redis):
         """Test async tag pull tracking in testing mode (runs synchronously)."""
@@ -429,18 +616,17 @@ class TestPullMetrics:
         manifest_digest = "sha256:abc123"
 
         # Mock Lua script execution
-        mock_redis.eval.return_value = "1"  # Return pull_count as string
+        mock_redis.evalsha.return_value = "1"  # Return pull_count as string
 
         # Execute
         pull_metrics_testing.track_tag_pull(repository, tag_name, manifest_digest)
 
         # In testing mode, should run synchronously
-        mock_redis.eval.assert_called_once()
+        mock_redis.evalsha.assert_called_once()
 
-    def test_track_tag_pull_async_production_mode(self, mock_redis):
-        """Test async tag pull tracking in production mode (runs in thread pool)."""
-        redis_config = {"host": "localhost", "port": 6379}
-        pm = PullMetrics(redis_config)
+    def test_track_tag_pull_async_production_mode(self, pull_metrics_production, mock_redis):
+        """Test async tag pull tracking in production mode (batched by the flusher thread)."""
+        pm = pull_metrics_production
 
         repository = Mock()
         repository.id = 123
@@ -451,11 +637,126 @@ class TestPullMetrics:
         mock_pipeline = MagicMock()
         mock_redis.pipeline.return_value = mock_pipeline
 
-        # Execute
+        # Execute, then shut down to force the queued events to be written
         pm.track_tag_pull(repository, tag_name, manifest_digest)
+        pm.track_manifest_pull(repository, manifest_digest)
+        pm.shutdown()
 
-        # Should submit to executor
-        assert pm._executor is not None
+        # The Lua script is not used on the batched path
+        mock_redis.evalsha.assert_not_called()
+        mock_pipeline.hset.assert_any_call(
+            "pull_events:repo:123:tag:latest:sha256:abc123",
+            mapping={
+                "repository_id": "123",
+                "tag_name": "latest",
+                "manifest_digest": "sha256:abc123",
+                "last_pull_timestamp": ANY,
+                "pull_method": "tag",
+            },
+        )
+        mock_pipeline.hset.assert_any_call(
+            "pull_events:repo:123:digest:sha256:abc123",
+            mapping={
+                "repository_id": "123",
+                "tag_name": "",
+                "manifest_digest": "sha256:abc123",
+                "last_pull_timestamp": ANY,
+                "pull_method": "digest",
+            },
+        )
+        mock_pipeline.hincrby.assert_any_call(
+            "pull_events:repo:123:tag:latest:sha256:abc123", "pull_count", 1
+        )
+        mock_pipeline.hincrby.assert_any_call(
+            "pull_events:repo:123:digest:sha256:abc123", "pull_count", 1
+        )
+        assert mock_pipeline.execute.called
+
+    def test_write_batch_coalesces_repeated_keys(self, pull_metrics_testing, mock_redis):
+        """Test that repeated pulls of one key become a single HSET and HINCRBY."""
+        mock_pipeline = MagicMock()
+        mock_redis.pipeline.return_value = mock_pipeline
+
+        tag_key = "pull_events:repo:1:tag:latest:sha256:abc"
+        digest_key = "pull_events:repo:1:digest:sha256:abc"
+        batch = [
+            (tag_key, {"pull_method": "tag"}),
+            (digest_key, {"pull_method": "digest"}),
+            (tag_key, {"pull_method": "tag"}),
+            (tag_key, {"pull_method": "tag"}),
+        ]
+
+        pull_metrics_testing._write_batch(batch, 1704110400)
+
+        assert mock_pipeline.hset.call_count == 2
+        assert mock_pipeline.hincrby.call_count == 2
+        mock_pipeline.set.assert_called_once_with(PULL_EVENTS_PENDING_KEY, 1)
+        mock_pipeline.hset.assert_any_call(
+            tag_key, mapping={"pull_method": "tag", "last_pull_timestamp": 1704110400}
+        )
+        mock_pipeline.hset.assert_any_call(
+            digest_key, mapping={"pull_method": "digest", "last_pull_timestamp": 1704110400}
+        )
+        mock_pipeline.hincrby.assert_any_call(tag_key, "pull_count", 3)
+        mock_pipeline.hincrby.assert_any_call(digest_key, "pull_count", 1)
+        mock_pipeline.execute.assert_called_once()
+
+    def test_write_batch_single_key_skips_pipeline(self, pull_metrics_testing, mock_redis):
+        """Test that a batch of one distinct key is written with a single script call."""
+        tag_key = "pull_events:repo:1:tag:latest:sha256:abc"
+        batch = [
+            (tag_key, {"repository_id": "1", "pull_method": "tag"}),
+            (tag_key, {"repository_id": "1", "pull_method": "tag"}),
+        ]
+
+        pull_metrics_testing._write_batch(batch, 1704110400)
+
+        mock_redis.pipeline.assert_not_called()
+        mock_redis.evalsha.assert_called_once_with(
+            _script_sha(PullMetrics._WRITE_PULL_EVENT_SCRIPT),
+            2,
+            tag_key,
+            PULL_EVENTS_PENDING_KEY,
+            2,
+            "repository_id",
+            "1",
+            "pull_method",
+            "tag",
+            "last_pull_timestamp",
+            1704110400,
+        )
+
+    def test_enqueue_drops_event_when_queue_full(self, pull_metrics_testing):
+        """Test that a full queue drops the event instead of blocking the caller."""
+        pull_metrics_testing._queue = queue.Queue(maxsize=1)
+        pull_metrics_testing._enqueue("key1", {})
+
+        with patch("util.pullmetrics.logger") as mock_logger:
+            pull_metrics_testing._enqueue("key2", {})
+            mock_logger.warning.assert_called_once()
+
+        assert pull_metrics_testing._queue.qsize() == 1
+
+    def test_drain_queue_respects_batch_size(self, pull_metrics_testing):
+        """Test that a drained batch never exceeds the configured batch size."""
+        pull_metrics_testing._queue = queue.Queue()
+        pull_metrics_testing._batch_size = 2
+        for i in range(3):
+            pull_metrics_testing._queue.put(("key%s" % i, {}))
+
+        batch, stopping = pull_metrics_testing._drain_queue()
+        assert batch == [("key0", {}), ("key1", {})]
+        assert stopping is False
+
+    def test_drain_queue_stops_on_marker(self, pull_metrics_testing):
+        """Test that the stop marker ends the batch and is reported to the flusher."""
+        pull_metrics_testing._queue = queue.Queue()
+        pull_metrics_testing._queue.put(("key0", {}))
+        pull_metrics_testing._queue.put(PullMetrics._STOP)
+
+        batch, stopping = pull_metrics_testing._drain_queue()
+        assert batch == [("key0", {})]
+        assert stopping is True
 
     def test_track_tag_pull_redis_error_handling(self, pull_metrics_testing, mock_redis):
         """Test tag pull tracking handles Redis connection errors gracefully."""
@@ -482,13 +783,13 @@ class TestPullMetrics:
         manifest_digest = "sha256:xyz789"
 
         # Mock Lua script execution
-        mock_redis.eval.return_value = "1"  # Return pull_count as string
+        mock_redis.evalsha.return_value = "1"  # Return pull_count as string
 
         # Execute
         pull_metrics_testing.track_manifest_pull(repository, manifest_digest)
 
         # In testing mode, should run synchronously
-        mock_redis.eval.assert_called_once()
+        mock_redis.evalsha.assert_called_once()
 
     def test_track_manifest_pull_redis_error_handling(self, pull_metrics_testing, mock_redis):
         """Test manifest pull tracking handles Redis errors gracefully."""
@@ -499,7 +800,7 @@ class TestPullMetrics:
         # Ensure connection can be established (ping succeeds)
         mock_redis.ping.return_value = True
         # Mock Lua script execution to raise error
-        mock_redis.eval.side_effect = redis.RedisError("Connection failed")
+        mock_redis.evalsha.side_effect = redis.RedisError("Connection failed")
 
         # Execute - should not raise exception, should log error
         with patch("util.pullmetrics.logger") as mock_logger:
@@ -535,7 +836,7 @@ class TestPullMetrics:
         # Ensure connection can be established (ping succeeds)
         mock_redis.ping.return_value = True
         # Mock Lua script execution to raise error
-        mock_redis.eval.side_effect = redis.RedisError("Lua script execution failed")
+        mock_redis.evalsha.side_effect = redis.RedisError("Lua script execution failed")
 
         # Execute - should not raise exception, should log error
         with patch("util.pullmetrics.logger") as mock_logger:
@@ -549,13 +850,14 @@ class TestPullMetrics:
         key = "pull_events:repo:123:tag:latest:sha256:abc123"
 
         # Mock Redis response
-        mock_redis.hgetall.return_value = {
-            b"repository_id": b"123",
-            b"tag_name": b"latest",
-            b"manifest_digest": b"sha256:abc123",
-            b"pull_count": b"10",
-            b"last_pull_timestamp": b"1704110400",
-        }
+        mock_redis.hmget.return_value = [
+            "123",
+            "latest",
+            "sha256:abc123",
+            "10",
+            "1704110400",
+            "tag",
+        ]
 
         # Execute
         result = pull_metrics_testing._get_pull_statistics(key)
@@ -567,13 +869,40 @@ class TestPullMetrics:
         assert result["manifest_digest"] == "sha256:abc123"
         assert result["pull_count"] == 10
         assert result["last_pull_timestamp"] == "1704110400"
+        assert result["pull_method"] == "tag"
+
+    def test_get_pull_statistics_omits_missing_fields(self, pull_metrics_testing, mock_redis):
+        """Test that fields absent from the hash are left out of the result."""
+        mock_redis.hmget.return_value = ["456", None, "sha256:def456", "20", None, "digest"]
+
+        result = pull_metrics_testing._get_pull_statistics(
+            "pull_events:repo:456:digest:sha256:def456"
+        )
+
+        assert result == {
+            "repository_id": "456",
+            "manifest_digest": "sha256:def456",
+            "pull_count": 20,
+            "pull_method": "digest",
+        }
+
+    def test_connection_pool_decodes_responses(self, pull_metrics_testing):
+        """Test that the client decodes responses so no per-field decoding is needed."""
+        assert pull_metrics_testing._connection_pool.connection_kwargs["decode_responses"] is True
+
+    def test_connection_pool_overrides_configured_decode_responses(self, mock_redis):
+        """Test that a decode_responses setting in the config cannot disable decoding."""
+        redis_config = {"host": "localhost", "decode_responses": False, "_testing": True}
+        pm = PullMetrics(redis_config)
+
+        assert pm._connection_pool.connection_kwargs["decode_responses"] is True
 
     def test_get_pull_statistics_empty(self, pull_metrics_testing, mock_redis):
         """Test retrieving non-existent pull statistics."""
         key = "pull_events:repo:123:tag:nonexistent:sha256:abc123"
 
-        # Mock Redis response (empty)
-        mock_redis.hgetall.return_value = {}
+        # Mock Redis response (every field missing)
+        mock_redis.hmget.return_value = [None] * len(PullMetrics._PULL_STATISTICS_FIELDS)
 
         # Execute
         result = pull_metrics_testing._get_pull_statistics(key)
@@ -587,8 +916,8 @@ class TestPullMetrics:
 
         # Ensure connection can be established (ping succeeds)
         mock_redis.ping.return_value = True
-        # Mock hgetall to raise error when called
-        mock_redis.hgetall.side_effect = redis.RedisError("Connection failed")
+        # Mock hmget to raise error when called
+        mock_redis.hmget.side_effect = redis.RedisError("Connection failed")
 
         # Execute
         with patch("util.pullmetrics.logger") as mock_logger:
@@ -607,12 +936,7 @@ class TestPullMetrics:
         manifest_digest = "sha256:abc123"
 
         # Mock Redis response
-        mock_redis.hgetall.return_value = {
-            b"repository_id": b"123",
-            b"tag_name": b"latest",
-            b"manifest_digest": b"sha256:abc123",
-            b"pull_count": b"15",
-        }
+        mock_redis.hmget.return_value = ["123", "latest", "sha256:abc123", "15", None, None]
 
         # Execute
         result = pull_metrics_testing.get_tag_pull_statistics(
@@ -622,7 +946,9 @@ class TestPullMetrics:
         # Verify
         assert result is not None
         assert result["pull_count"] == 15
-        mock_redis.hgetall.assert_called_once_with("pull_events:repo:123:tag:latest:sha256:abc123")
+        mock_redis.hmget.assert_called_once_with(
+            "pull_events:repo:123:tag:latest:sha256:abc123", PullMetrics._PULL_STATISTICS_FIELDS
+        )
 
     def test_get_manifest_pull_statistics(self, pull_metrics_testing, mock_redis):
         """Test get_manifest_pull_statistics method."""
@@ -630,11 +956,7 @@ class TestPullMetrics:
         manifest_digest = "sha256:def456"
 
         # Mock Redis response
-        mock_redis.hgetall.return_value = {
-            b"repository_id": b"456",
-            b"manifest_digest": b"sha256:def456",
-            b"pull_count": b"20",
-        }
+        mock_redis.hmget.return_value = ["456", None, "sha256:def456", "20", None, None]
 
         # Execute
         result = pull_metrics_testing.get_manifest_pull_statistics(repository_id, manifest_digest)
@@ -642,27 +964,78 @@ class TestPullMetrics:
         # Verify
         assert result is not None
         assert result["pull_count"] == 20
-        mock_redis.hgetall.assert_called_once_with("pull_events:repo:456:digest:sha256:def456")
+        mock_redis.hmget.assert_called_once_with(
+            "pull_events:repo:456:digest:sha256:def456", PullMetrics._PULL_STATISTICS_FIELDS
+        )
 
-    def test_shutdown_with_executor(self, mock_redis):
-        """Test shutdown method with thread pool executor."""
-        redis_config = {"host": "localhost", "port": 6379}
-        pm = PullMetrics(redis_config)
+    def test_get_pull_statistics_bulk(self, pull_metrics_testing, mock_redis):
+        """Test bulk statistics retrieval pipelines one HMGET per key."""
+        mock_pipeline = MagicMock()
+        mock_redis.pipeline.return_value = mock_pipeline
+        mock_pipeline.execute.return_value = [
+            ["123", "latest", "sha256:abc123", "15", "1704110400", "tag"],
+            [None] * len(PullMetrics._PULL_STATISTICS_FIELDS),
+        ]
+        keys = [
+            "pull_events:repo:123:tag:latest:sha256:abc123",
+            "pull_events:repo:123:tag:missing:sha256:abc123",
+        ]
+
+        results = pull_metrics_testing.get_pull_statistics_bulk(keys)
+
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        assert mock_pipeline.hmget.call_count == 2
+        mock_pipeline.hmget.assert_any_call(keys[0], PullMetrics._PULL_STATISTICS_FIELDS)
+        mock_pipeline.execute.assert_called_once()
+        assert results[0]["pull_count"] == 15
+        assert results[0]["tag_name"] == "latest"
+        assert results[1] is None
+
+    def test_get_pull_statistics_bulk_empty(self, pull_metrics_testing, mock_redis):
+        """Test bulk statistics retrieval with no keys does not touch Redis."""
+        assert pull_metrics_testing.get_pull_statistics_bulk([]) == []
+        mock_redis.pipeline.assert_not_called()
+
+    def test_get_pull_statistics_bulk_redis_error(self, pull_metrics_testing, mock_redis):
+        """Test bulk statistics retrieval returns None for every key on Redis errors."""
+        mock_redis.pipeline.return_value.execute.side_effect = redis.RedisError("failed")
+
+        with patch("util.pullmetrics.logger") as mock_logger:
+            results = pull_metrics_testing.get_pull_statistics_bulk(["key1", "key2"])
+            mock_logger.warning.assert_called()
 
-        # Mock executor
-        pm._executor = Mock()
+        assert results == [None, None]
 
-        # Execute
-        pm.shutdown()
+    def test_shutdown_with_flusher_thread(self, pull_metrics_production):
+        """Test shutdown writes queued events and stops the flusher thread."""
+        pm = pull_metrics_production
 
-        # Verify
-        pm._executor.shutdown.assert_called_once_with(wait=True)
+        with patch.object(pm, "_write_batch") as mock_write_batch:
+            pm.track_manifest_pull(123, "sha256:abc123")
+
+            # Execute
+            pm.shutdown()
 
-    def test_shutdown_without_executor(self, pull_metrics_testing):
-        """Test shutdown method without thread pool executor."""
+            # Verify
+            assert not pm._flusher_thread.is_alive()
+            mock_write_batch.assert_called_once()
+            batch = mock_write_batch.call_args[0][0]
+            assert [key for key, _ in batch] == ["pull_events:repo:123:digest:sha256:abc123"]
+
+    def test_shutdown_without_flusher_thread(self, pull_metrics_testing):
+        """Test shutdown method without flusher thread."""
         # Execute - should not raise exception
         pull_metrics_testing.shutdown()
-        # No executor, so nothing to verify
+        # No flusher thread, so nothing to verify
+
+    def test_shutdown_is_idempotent(self, pull_metrics_production):
+        """Test that a second shutdown returns without touching the stopped thread."""
+        pm = pull_metrics_production
+        pm.shutdown()
+
+        with patch.object(pm, "_queue") as mock_queue:
+            pm.shutdown()
+            mock_queue.put.assert_not_called()
 
 
 class TestPullMetricsIntegration:
@@ -675,15 +1048,17 @@ class TestPullMetricsIntegration:
         tag_name = "integration-test"
         manifest_digest = "sha256:integration123"
 
-        # Mock pipeline and hgetall
+        # Mock pipeline and hmget
         mock_pipeline = MagicMock()
         mock_redis.pipeline.return_value = mock_pipeline
-        mock_redis.hgetall.return_value = {
-            b"repository_id": b"100",
-            b"tag_name": b"integration-test",
-            b"manifest_digest": b"sha256:integration123",
-            b"pull_count": b"1",
-        }
+        mock_redis.hmget.return_value = [
+            "100",
+            "integration-test",
+            "sha256:integration123",
+            "1",
+            None,
+            None,
+        ]
 
         # Track a pull
         pull_metrics_testing.track_tag_pull_sync(repository, tag_name, manifest_digest)
@@ -703,14 +1078,10 @@ class TestPullMetricsIntegration:
         repository.id = 200
         manifest_digest = "sha256:integration456"
 
-        # Mock pipeline and hgetall
+        # Mock pipeline and hmget
         mock_pipeline = MagicMock()
         mock_redis.pipeline.return_value = mock_pipeline
-        mock_redis.hgetall.return_value = {
-            b"repository_id": b"200",
-            b"manifest_digest": b"sha256:integration456",
-            b"pull_count": b"1",
-        }
+        mock_redis.hmget.return_value = ["200", None, "sha256:integration456", "1", None, None]
 
         # Track a pull
         pull_metrics_testing.track_manifest_pull_sync(repository, manifest_digest)
@@ -10,10 +10,13 @@ Converts Redis pull events into persistent TagPullStatistics and ManifestPullSta
 """
 
 import logging.config
+import os
+import string
 import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 import redis
 
@@ -24,8 +27,8 @@ from data.model.pull_statistics import (
     bulk_upsert_manifest_statistics,
     bulk_upsert_tag_statistics,
 )
-from digest.digest_tools import Digest, InvalidDigestException
 from util.log import logfile_path
+from util.pullmetrics import PULL_EVENTS_PENDING_KEY
 from workers.gunicorn_worker import GunicornWorker
 from workers.worker import Worker
 
@@ -36,9 +39,54 @@ POLL_PERIOD = app.config.get("REDIS_FLUSH_INTERVAL_SECONDS", 300)  # 5 minutes
 BATCH_SIZE = app.config.get("REDIS_FLUSH_WORKER_BATCH_SIZE", 1000)
 REDIS_SCAN_COUNT = app.config.get("REDIS_FLUSH_WORKER_SCAN_COUNT", 100)
 
+# Connection pool shared by every worker instance in the process, so that reconnecting
+# reuses pooled sockets instead of opening a new connection each time. Replies are parsed
+# by hiredis when it is installed. Servers before Redis 6 reject the RESP3 handshake, so
+# RESP2 stays the default and RESP3 is opt-in with REDIS_FLUSH_WORKER_PROTOCOL: 3.
+_redis_config = app.config.get("PULL_METRICS_REDIS", {}) or {}
+_redis_connection_timeout = app.config.get("REDIS_CONNECTION_TIMEOUT", 5)
+REDIS_POOL = redis.ConnectionPool(
+    host=_redis_config.get("host", "localhost"),
+    port=_redis_config.get("port", 6379),
+    db=_redis_config.get("db", 1),
+    password=_redis_config.get("password"),
+    decode_responses=True,
+    socket_connect_timeout=_redis_connection_timeout,
+    socket_timeout=_redis_connection_timeout,
+    socket_keepalive=True,
+    max_connections=app.config.get("REDIS_FLUSH_WORKER_POOL_SIZE", 16),
+    protocol=app.config.get("REDIS_FLUSH_WORKER_PROTOCOL", 2),
+)
+
+# Fields every pull event hash must carry to be flushed
+REQUIRED_FIELDS = ("repository_id", "manifest_digest", "pull_count", "last_pull_timestamp")
+
+# Characters allowed on each side of a digest, as in digest.digest_tools.DIGEST_PATTERN
+_DIGEST_ALGORITHM_CHARS = frozenset(string.ascii_letters + string.digits + "_+.-")
+_DIGEST_HEX_CHARS = frozenset(string.hexdigits)
+
+# Maximum number of commands queued in a single pipeline, bounding the reply buffer
+REDIS_PIPELINE_CHUNK_SIZE = 500
+
+# Maximum number of keys passed to a single UNLINK command during cleanup
+REDIS_UNLINK_BATCH_SIZE = 500
+
 # RENAME atomically claims the key, then we delete only after successful DB write
 # This prevents data loss if database flush fails
 
+# Lua script claiming a pull_events key: RENAME it to its processing key (KEYS[2]) and
+# return the processing key's hash in the same atomic step. Orphaned processing keys are
+# passed as both keys and only read. Returns nil if the key no longer exists.
+CLAIM_PULL_EVENTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+if KEYS[1] ~= KEYS[2] then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+end
+return redis.call('HGETALL', KEYS[2])
+"""
+
 
 class RedisFlushWorker(Worker):
     """
@@ -54,29 +102,21 @@ class RedisFlushWorker(Worker):
     def __init__(self):
         super(RedisFlushWorker, self).__init__()
         self.redis_client = None
+        self._claim_script = None
+        # Process that opened the client's dedicated connection, if any
+        self._dedicated_connection_pid = None
+        # The first cycle always scans, picking up keys left by earlier runs or written
+        # before the pending flag existed
+        self._initial_scan_done = False
         self._initialize_redis_client()
         self.add_operation(self._flush_pull_metrics, POLL_PERIOD)
 
     def _initialize_redis_client(self):
         """Initialize Redis client for pull metrics."""
         try:
-            redis_config = app.config.get("PULL_METRICS_REDIS", {})
-            redis_host = redis_config.get("host", "localhost")
-            redis_port = redis_config.get("port", 6379)
-            redis_db = redis_config.get("db", 1)
-            redis_password = redis_config.get("password")
-            redis_connection_timeout = app.config.get("REDIS_CONNECTION_TIMEOUT", 5)
-
-            # Create Redis client
-            self.redis_client = redis.StrictRedis(
-                host=redis_host,
-                port=redis_port,
-                db=redis_db,
-                password=redis_password,
-                decode_responses=True,
-                socket_connect_timeout=redis_connection_timeout,
-                socket_timeout=redis_connection_timeout,
-            )
+            # Create Redis client on the shared connection pool. Its dedicated connection is
+            # only opened by the first flush; see _ensure_dedicated_connection
+            self.redis_client = redis.StrictRedis(connection_pool=REDIS_POOL)
 
             # Test connection
             self.redis_client.ping()
@@ -99,103 +139,196 @@ class RedisFlushWorker(Worker):
             return
 
         try:
-            logger.debug("RedisFlushWorker: Starting pull metrics flush")
-            start_time = time.time()
-
-            all_keys = self._scan_redis_keys("pull_events:*", BATCH_SIZE)
+            self._ensure_dedicated_connection()
 
-            # Deduplicate keys (scan might return duplicates)
-            all_keys = list(set(all_keys))
+            # Producers set the pending flag with every write, so an unset flag means there
+            # is nothing to scan for
+            if self._initial_scan_done and not self.redis_client.exists(PULL_EVENTS_PENDING_KEY):
+                logger.debug("RedisFlushWorker: No pending pull events, skipping scan")
+                return
 
-            # Separate regular keys from orphaned processing keys
-            pull_event_keys = [key for key in all_keys if ":processing:" not in key]
-            orphaned_processing_keys = [key for key in all_keys if ":processing:" in key]
+            # Clear the flag before scanning, so events written during the scan set it again
+            self.redis_client.delete(PULL_EVENTS_PENDING_KEY)
+            self._initial_scan_done = True
 
-            # Process orphaned processing keys (from previous failed flushes)
-            # These should not be deleted and be reprocessed in next cycle to avoid data loss
-            if orphaned_processing_keys:
-                logger.info(
-                    f"RedisFlushWorker: Found {len(orphaned_processing_keys)} orphaned processing keys, will process them"
-                )
-                pull_event_keys.extend(orphaned_processing_keys)
+            logger.debug("RedisFlushWorker: Starting pull metrics flush")
+            found_keys = False
+
+            # Flush each batch of keys as the SCAN cursor produces it
+            for all_keys in self._iter_event_keys("pull_events:*", BATCH_SIZE):
+                found_keys = True
+                if not self._flush_key_batch(all_keys):
+                    # Leave the rest of the keyspace for the next cycle
+                    self._mark_events_pending()
+                    break
 
-            if not pull_event_keys:
+            if not found_keys:
                 logger.debug("RedisFlushWorker: No pull event keys found")
-                return
 
-            logger.info(f"RedisFlushWorker: Processing {len(pull_event_keys)} Redis keys")
+        except redis.RedisError as re:
+            logger.error(f"RedisFlushWorker: Redis error during pull metrics flush: {re}")
+            self._mark_events_pending()
+        except Exception as e:
+            logger.error(f"RedisFlushWorker: Error during pull metrics flush: {e}")
+            self._mark_events_pending()
 
-            # Process keys and aggregate data
-            (
-                tag_updates,
-                manifest_updates,
-                database_dependent_keys,
-            ) = self._process_redis_events(pull_event_keys)
+    def _ensure_dedicated_connection(self):
+        """
+        Switch to a client holding one dedicated connection opened by the current process.
 
-            # Perform bulk database operations
-            success = self._flush_to_database(tag_updates, manifest_updates)
+        Plain commands then reuse that connection instead of checking one out of the pool per
+        command; pipelines still take their own connection from the pool. The worker is built
+        in the gunicorn parent and run in a forked child, and only pooled connections are reset
+        after a fork, so the dedicated connection is opened here rather than in __init__.
+        """
+        pid = os.getpid()
+        if self._dedicated_connection_pid == pid:
+            return
 
-            if success:
-                # Clean up Redis keys after successful database writes
-                self._cleanup_redis_keys(database_dependent_keys)
+        # Leave clients that were not built on the shared pool as they are
+        if self.redis_client is None or self.redis_client.connection_pool is not REDIS_POOL:
+            return
 
-                elapsed_time = time.time() - start_time
-                total_processed = len(database_dependent_keys)
-                logger.info(
-                    f"RedisFlushWorker: Successfully processed {total_processed} keys "
-                    f"({len(tag_updates)} tag updates, {len(manifest_updates)} manifest updates) "
-                    f"in {elapsed_time:.2f}s"
-                )
-            else:
-                logger.warning(
-                    f"RedisFlushWorker: Database flush failed, keeping {len(database_dependent_keys)} keys for retry"
-                )
+        self.redis_client = redis.StrictRedis(
+            connection_pool=REDIS_POOL, single_connection_client=True
+        )
+        self._claim_script = None
+        self._dedicated_connection_pid = pid
 
-        except redis.RedisError as re:
-            logger.error(f"RedisFlushWorker: Redis error during pull metrics flush: {re}")
+    def _mark_events_pending(self):
+        """Set the pending flag so the next cycle scans for keys this one left behind."""
+        if self.redis_client is None:
+            return
+
+        try:
+            self.redis_client.set(PULL_EVENTS_PENDING_KEY, 1)
         except Exception as e:
-            logger.error(f"RedisFlushWorker: Error during pull metrics flush: {e}")
+            logger.warning(f"RedisFlushWorker: Failed to set pending pull events flag: {e}")
 
-    def _scan_redis_keys(self, pattern: str, limit: int) -> List[str]:
+    def _flush_key_batch(self, all_keys: List[str]) -> bool:
         """
-        Scan Redis for keys matching the pattern.
+        Process one batch of scanned keys and flush their pull metrics to the database.
 
         Args:
-            pattern: Redis key pattern to match
-            limit: Maximum number of keys to return
+            all_keys: List of Redis keys to flush
 
         Returns:
-            List of matching Redis keys
+            False if the database flush failed, True otherwise
         """
-        try:
-            keys_set: Set[str] = set()
-            cursor = 0
+        start_time = time.time()
 
-            while len(keys_set) < limit:
-                if self.redis_client is None:
-                    break
-                cursor, batch_keys = self.redis_client.scan(
+        # Separate regular keys from orphaned processing keys
+        pull_event_keys = [key for key in all_keys if ":processing:" not in key]
+        orphaned_processing_keys = [key for key in all_keys if ":processing:" in key]
+
+        # Process orphaned processing keys (from previous failed flushes)
+        # These should not be deleted and be reprocessed in next cycle to avoid data loss
+        if orphaned_processing_keys:
+            logger.info(
+                f"RedisFlushWorker: Found {len(orphaned_processing_keys)} orphaned processing keys, will process them"
+            )
+            pull_event_keys.extend(orphaned_processing_keys)
+
+        logger.info(f"RedisFlushWorker: Processing {len(pull_event_keys)} Redis keys")
+
+        # Process keys and aggregate data
+        (
+            tag_updates,
+            manifest_updates,
+            database_dependent_keys,
+        ) = self._process_redis_events(pull_event_keys)
+
+        # Perform bulk database operations
+        success = self._flush_to_database(tag_updates, manifest_updates)
+
+        if success:
+            # Clean up Redis keys after successful database writes
+            self._cleanup_redis_keys(database_dependent_keys)
+
+            elapsed_time = time.time() - start_time
+            total_processed = len(database_dependent_keys)
+            logger.info(
+                f"RedisFlushWorker: Successfully processed {total_processed} keys "
+                f"({len(tag_updates)} tag updates, {len(manifest_updates)} manifest updates) "
+                f"in {elapsed_time:.2f}s"
+            )
+        else:
+            logger.warning(
+                f"RedisFlushWorker: Database flush failed, keeping {len(database_dependent_keys)} keys for retry"
+            )
+
+        return success
+
+    def _iter_event_keys(self, pattern: str, batch_size: int) -> Iterator[List[str]]:
+        """
+        Iterate over Redis keys matching the pattern using cursor-based SCAN.
+
+        The next batch is scanned on a background thread while the caller processes the
+        current one, so SCAN round trips overlap with claiming and the database flush.
+        Keys are deduplicated across the whole iteration, since SCAN may return a key
+        more than once. A Redis error ends the iteration after logging it.
+
+        Args:
+            pattern: Redis key pattern to match
+            batch_size: Maximum number of keys in each yielded batch
+
+        Yields:
+            Lists of at most batch_size matching Redis keys
+        """
+        redis_client = self.redis_client
+        if redis_client is None:
+            return
+
+        seen_keys: Set[str] = set()
+        pending_keys: List[str] = []
+        cursor = 0
+        scan_finished = False
+
+        def scan_batch() -> List[str]:
+            nonlocal cursor, pending_keys, scan_finished
+            while len(pending_keys) < batch_size and not scan_finished:
+                cursor, batch_keys = redis_client.scan(
                     cursor=cursor, match=pattern, count=REDIS_SCAN_COUNT
                 )
+                for key in batch_keys:
+                    if key not in seen_keys:
+                        seen_keys.add(key)
+                        pending_keys.append(key)
 
-                if batch_keys:
-                    # Add keys to set to automatically deduplicate
-                    keys_set.update(batch_keys)
-
-                # Break if we've scanned through all keys
+                # Stop once we've scanned through all keys
                 if cursor == 0:
-                    break
+                    scan_finished = True
 
-            # Convert set back to list and limit results
-            keys_list = list(keys_set)
-            return keys_list[:limit]  # Ensure we don't exceed the limit
+            batch = pending_keys[:batch_size]
+            pending_keys = pending_keys[batch_size:]
+            return batch
 
-        except redis.RedisError as re:
-            logger.error(f"RedisFlushWorker: Redis error during key scan: {re}")
-            return []
-        except Exception as e:
-            logger.error(f"RedisFlushWorker: Error scanning Redis keys: {e}")
-            return []
+        # Scan state is only touched by the executor thread while a scan is in flight;
+        # result() hands it back before the next scan is submitted
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pull-events-scan")
+        try:
+            future: Optional[Future] = executor.submit(scan_batch)
+            while future is not None:
+                try:
+                    batch = future.result()
+                except redis.RedisError as re:
+                    logger.error(f"RedisFlushWorker: Redis error during key scan: {re}")
+                    self._mark_events_pending()
+                    return
+                except Exception as e:
+                    logger.error(f"RedisFlushWorker: Error scanning Redis keys: {e}")
+                    self._mark_events_pending()
+                    return
+
+                # Prefetch the next batch before handing this one to the caller
+                future = None
+                if pending_keys or not scan_finished:
+                    future = executor.submit(scan_batch)
+
+                if batch:
+                    yield batch
+        finally:
+            executor.shutdown(wait=True)
 
     def _process_redis_events(self, keys: List[str]) -> Tuple[List[Dict], List[Dict], Set[str]]:
         """
@@ -212,118 +345,115 @@ class RedisFlushWorker(Worker):
         manifest_updates_dict: Dict[Tuple[int, str], Dict] = (
             {}
         )  # Key: (repository_id, manifest_digest)
-        database_dependent_keys = (
-            set()
-        )  # Keys that should only be cleaned up after successful DB write
+        # Keys that should only be cleaned up after successful DB write
+        database_dependent_keys: Set[str] = set()
+
+        # Pair every key with the processing key it is claimed into. Repeated keys are
+        # dropped first (keeping order); a second claim would only find the key gone
+        claimed_keys: List[Tuple[str, str]] = []  # (original key, processing key)
+        for key in dict.fromkeys(keys):
+            # Basic validation - ensure it's a pull_events key
+            if not key.startswith("pull_events:"):
+                continue
 
-        for key in keys:
-            try:
-                # Basic validation - ensure it's a pull_events key
-                if not key.startswith("pull_events:"):
-                    continue
+            if self.redis_client is None:
+                logger.warning("RedisFlushWorker: Redis client is None, skipping key")
+                continue
 
-                # ATOMIC CLAIM: Use RENAME to atomically claim the key
-                # This prevents race conditions while preserving data for retry if DB flush fails
-                if self.redis_client is None:
-                    logger.warning("RedisFlushWorker: Redis client is None, skipping key")
-                    continue
+            # Check if this is already a processing key (orphaned from previous run)
+            if ":processing:" in key:
+                # This is an orphaned processing key - read it directly
+                processing_key = key
+            else:
+                # The claim renames the key to a processing namespace, so new increments
+                # create a new key which will be processed in the next cycle
+                # Use timestamp + UUID to ensure uniqueness even if multiple workers process same key simultaneously
+                processing_key = (
+                    f"{key}:processing:{int(time.time() * 1000)}:{uuid.uuid4().hex[:8]}"
+                )
 
-                # Check if this is already a processing key (orphaned from previous run)
-                is_processing_key = ":processing:" in key
+            claimed_keys.append((key, processing_key))
 
-                if is_processing_key:
-                    # This is an orphaned processing key - read it directly
-                    processing_key = key
-                    metrics_data = self.redis_client.hgetall(processing_key)
-                else:
-                    # Atomically rename the key to a processing namespace
-                    # This prevents new increments from affecting our read
-                    # Use timestamp + UUID to ensure uniqueness even if multiple workers process same key simultaneously
-                    processing_key = (
-                        f"{key}:processing:{int(time.time() * 1000)}:{uuid.uuid4().hex[:8]}"
-                    )
+        if not claimed_keys:
+            return [], [], database_dependent_keys
 
-                    try:
-                        # New pulls will create a new key, which will be processed in next cycle
-                        self.redis_client.rename(key, processing_key)
-                    except redis.ResponseError as e:
-                        # RENAME raises ResponseError if source key doesn't exist
-                        error_msg = str(e).lower()
-                        if "no such key" in error_msg or "no such file" in error_msg:
-                            # Key doesn't exist (already processed or never created)
-                            continue
-                        else:
-                            logger.warning(f"RedisFlushWorker: RENAME failed for key {key}: {e}")
-                            continue
-
-                    # the original key is deleted and new pulls create new keys this avoids race conditions
-                    metrics_data = self.redis_client.hgetall(processing_key)
-
-                if not metrics_data:
-                    # Clean up the processing key immediately
-                    self.redis_client.delete(processing_key)
+        try:
+            all_metrics_data = self._claim_keys(claimed_keys)
+        except redis.RedisError as re:
+            # Keys claimed before the failure stay in the processing namespace and are
+            # retried as orphans
+            logger.error(f"RedisFlushWorker: Redis error claiming keys: {re}")
+            self._mark_events_pending()
+            return [], [], database_dependent_keys
+        except Exception as e:
+            logger.error(f"RedisFlushWorker: Error claiming keys: {e}")
+            self._mark_events_pending()
+            return [], [], database_dependent_keys
+
+        # Bind hot lookups to locals for the aggregation loop below
+        parse = self._parse_redis_key_data
+        mark_database_dependent = database_dependent_keys.add
+        cleanable_keys: Set[str] = set()
+        mark_cleanable = cleanable_keys.add
+
+        for (key, processing_key), metrics_data in zip(claimed_keys, all_metrics_data):
+            if metrics_data is None:
+                # Key doesn't exist (already processed or never created)
+                continue
+
+            try:
+                # Empty hashes and zero counts carry nothing to persist; skip parsing them
+                if not metrics_data or metrics_data.get("pull_count") == "0":
+                    mark_cleanable(processing_key)
                     continue
 
                 # Validate data before processing
-                if not self._validate_redis_key_data(key, metrics_data):
-                    # Invalid key, clean up the processing key immediately
+                parsed_fields = parse(key, metrics_data)
+                if parsed_fields is None:
                     logger.warning(f"RedisFlushWorker: Key {key} failed validation, cleaning up")
-                    self.redis_client.delete(processing_key)
+                    mark_cleanable(processing_key)
                     continue
 
                 # Extract data from Redis hash
-                repository_id = int(metrics_data.get("repository_id", 0))
-                tag_name = metrics_data.get("tag_name", "")
-                manifest_digest = metrics_data.get("manifest_digest", "")
-                pull_count = int(metrics_data.get("pull_count", 0))
-                last_pull_timestamp = int(metrics_data.get("last_pull_timestamp", 0))
-                pull_method = metrics_data.get("pull_method", "")
+                repository_id, pull_count, last_pull_timestamp = parsed_fields
+                get = metrics_data.get
+                tag_name = get("tag_name", "")
+                manifest_digest = get("manifest_digest", "")
+                pull_method = get("pull_method", "")
 
                 if pull_count <= 0:
-                    # No pulls, clean up the processing key immediately
-                    self.redis_client.delete(processing_key)
+                    # No pulls, nothing to persist
+                    mark_cleanable(processing_key)
                     continue
 
-                # Convert timestamp
-                pull_timestamp = (
-                    datetime.fromtimestamp(last_pull_timestamp) if last_pull_timestamp > 0 else None
-                )
-
                 # Aggregate manifest stats (both tag and digest pulls)
                 manifest_key = (repository_id, manifest_digest)
-                if manifest_key in manifest_updates_dict:
+                existing = manifest_updates_dict.get(manifest_key)
+                if existing is not None:
                     # Aggregate with existing entry
-                    existing = manifest_updates_dict[manifest_key]
                     existing["pull_count"] += pull_count
-                    # Keep the latest timestamp
-                    if pull_timestamp and existing["last_pull_timestamp"]:
-                        if pull_timestamp > existing["last_pull_timestamp"]:
-                            existing["last_pull_timestamp"] = pull_timestamp
-                    elif pull_timestamp:
-                        existing["last_pull_timestamp"] = pull_timestamp
+                    # Keep the latest timestamp; 0 (no timestamp) never wins
+                    if last_pull_timestamp > existing["last_pull_timestamp"]:
+                        existing["last_pull_timestamp"] = last_pull_timestamp
                 else:
                     # New entry
                     manifest_updates_dict[manifest_key] = {
                         "repository_id": repository_id,
                         "manifest_digest": manifest_digest,
                         "pull_count": pull_count,
-                        "last_pull_timestamp": pull_timestamp,
+                        "last_pull_timestamp": last_pull_timestamp,
                     }
 
                 # Additionally aggregate tag stats for tag pulls
                 if pull_method == "tag" and tag_name:
                     tag_key = (repository_id, tag_name)
-                    if tag_key in tag_updates_dict:
+                    existing = tag_updates_dict.get(tag_key)
+                    if existing is not None:
                         # Aggregate with existing entry
-                        existing = tag_updates_dict[tag_key]
                         existing["pull_count"] += pull_count
                         # Keep the latest timestamp and manifest
-                        if pull_timestamp and existing["last_pull_timestamp"]:
-                            if pull_timestamp > existing["last_pull_timestamp"]:
-                                existing["last_pull_timestamp"] = pull_timestamp
-                                existing["manifest_digest"] = manifest_digest
-                        elif pull_timestamp:
-                            existing["last_pull_timestamp"] = pull_timestamp
+                        if last_pull_timestamp > existing["last_pull_timestamp"]:
+                            existing["last_pull_timestamp"] = last_pull_timestamp
                             existing["manifest_digest"] = manifest_digest
                     else:
                         # New entry
@@ -332,26 +462,70 @@ class RedisFlushWorker(Worker):
                             "tag_name": tag_name,
                             "manifest_digest": manifest_digest,
                             "pull_count": pull_count,
-                            "last_pull_timestamp": pull_timestamp,
+                            "last_pull_timestamp": last_pull_timestamp,
                         }
 
                 # Mark processing key for cleanup after successful database write
                 # This ensures we don't lose data if DB flush fails (key can be retried)
-                database_dependent_keys.add(processing_key)
+                mark_database_dependent(processing_key)
 
-            except redis.RedisError as re:
-                logger.error(f"RedisFlushWorker: Redis error processing key {key}: {re}")
-                continue
             except Exception as e:
+                # The processing key is left in place; have the next cycle scan for it
                 logger.error(f"RedisFlushWorker: Error processing key {key}: {e}")
+                self._mark_events_pending()
                 continue
 
-        # Convert aggregated dictionaries to lists
+        # Keys with nothing to persist do not depend on the database write, so remove them
+        # now in one pipelined cleanup instead of a DELETE per key
+        self._cleanup_redis_keys(cleanable_keys)
+
+        # Convert aggregated dictionaries to lists. Timestamps were aggregated as epoch
+        # seconds, so a datetime is built once per row rather than once per event
         tag_updates = list(tag_updates_dict.values())
         manifest_updates = list(manifest_updates_dict.values())
+        fromtimestamp = datetime.fromtimestamp
+        for update in tag_updates + manifest_updates:
+            epoch = update["last_pull_timestamp"]
+            update["last_pull_timestamp"] = fromtimestamp(epoch) if epoch > 0 else None
 
         return tag_updates, manifest_updates, database_dependent_keys
 
+    def _claim_keys(self, claimed_keys: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+        """
+        Atomically claim keys into their processing keys and read their hashes.
+
+        Runs the claim script for every key in pipelines of bounded size, so claiming and
+        reading a whole batch takes one round trip per pipeline.
+
+        Args:
+            claimed_keys: List of (original key, processing key) pairs
+
+        Returns:
+            List of hash contents in the same order, with None for keys that no longer exist
+        """
+        if self._claim_script is None:
+            self._claim_script = self.redis_client.register_script(CLAIM_PULL_EVENTS_SCRIPT)
+
+        results: List[Optional[Dict]] = []
+        for i in range(0, len(claimed_keys), REDIS_PIPELINE_CHUNK_SIZE):
+            chunk = claimed_keys[i : i + REDIS_PIPELINE_CHUNK_SIZE]
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, processing_key in chunk:
+                self._claim_script(keys=[key, processing_key], client=pipe)
+
+            for (key, _), reply in zip(chunk, pipe.execute(raise_on_error=False)):
+                if isinstance(reply, Exception):
+                    logger.warning(f"RedisFlushWorker: Claim failed for key {key}: {reply}")
+                    self._mark_events_pending()
+                    results.append(None)
+                elif reply is None:
+                    results.append(None)
+                else:
+                    # Script replies carry the hash as a flat field/value list
+                    results.append(dict(zip(reply[::2], reply[1::2])))
+
+        return results
+
     def _flush_to_database(self, tag_updates: List[Dict], manifest_updates: List[Dict]) -> bool:
         """
         Flush aggregated updates to the database.
@@ -401,34 +575,38 @@ class RedisFlushWorker(Worker):
         Args:
             keys: Set of Redis keys to delete
         """
-        if not keys:
+        if not keys or self.redis_client is None:
             return
 
         try:
-            # Delete keys in batches to avoid blocking Redis
+            # UNLINK frees memory in the background; chunk the keys so that no single
+            # command does unbounded work, and send every chunk in one pipeline
             key_list = list(keys)
-            batch_size = 100
-            failed_deletions = []
+            batches = [
+                key_list[i : i + REDIS_UNLINK_BATCH_SIZE]
+                for i in range(0, len(key_list), REDIS_UNLINK_BATCH_SIZE)
+            ]
+            pipe = self.redis_client.pipeline(transaction=False)
+            for batch in batches:
+                pipe.unlink(*batch)
+            results = pipe.execute(raise_on_error=False)
 
-            for i in range(0, len(key_list), batch_size):
-                batch = key_list[i : i + batch_size]
-                if self.redis_client is not None:
-                    try:
-                        deleted_count = self.redis_client.delete(*batch)
-                        if deleted_count != len(batch):
-                            # Some keys may have been deleted by another process or expired
-                            logger.debug(
-                                f"RedisFlushWorker: Expected to delete {len(batch)} keys, actually deleted {deleted_count}"
-                            )
-                        else:
-                            logger.debug(
-                                f"RedisFlushWorker: Successfully deleted {deleted_count} Redis keys"
-                            )
-                    except Exception as batch_e:
-                        logger.warning(
-                            f"RedisFlushWorker: Failed to delete batch of keys: {batch_e}"
-                        )
-                        failed_deletions.extend(batch)
+            failed_deletions = []
+            for batch, deleted_count in zip(batches, results):
+                if isinstance(deleted_count, Exception):
+                    logger.warning(
+                        f"RedisFlushWorker: Failed to delete batch of keys: {deleted_count}"
+                    )
+                    failed_deletions.extend(batch)
+                elif deleted_count != len(batch):
+                    # Some keys may have been deleted by another process or expired
+                    logger.debug(
+                        f"RedisFlushWorker: Expected to delete {len(batch)} keys, actually deleted {deleted_count}"
+                    )
+                else:
+                    logger.debug(
+                        f"RedisFlushWorker: Successfully deleted {deleted_count} Redis keys"
+                    )
 
             if failed_deletions:
                 logger.warning(
@@ -440,69 +618,80 @@ class RedisFlushWorker(Worker):
         except Exception as e:
             logger.error(f"RedisFlushWorker: Error cleaning up Redis keys: {e}")
 
-    def _validate_redis_key_data(self, key: str, metrics_data: Dict) -> bool:
+    def _parse_redis_key_data(self, key: str, metrics_data: Dict) -> Optional[Tuple[int, int, int]]:
         """
-        Validate Redis key data for consistency and completeness.
+        Validate Redis key data and return its integer fields, parsing each field once.
 
         Args:
             key: Redis key being processed
             metrics_data: Data retrieved from Redis
 
         Returns:
-            True if data is valid, False otherwise
+            Tuple of (repository_id, pull_count, last_pull_timestamp), or None if invalid
         """
+        # Checks run cheapest first, so most invalid hashes are rejected before any parsing
         try:
-            # Check required fields
-            required_fields = [
-                "repository_id",
-                "manifest_digest",
-                "pull_count",
-                "last_pull_timestamp",
-            ]
-            for field in required_fields:
+            # Check required fields; a hash with too few fields cannot have them all
+            if len(metrics_data) < len(REQUIRED_FIELDS):
+                logger.debug(f"RedisFlushWorker: Key {key} missing required fields")
+                return None
+
+            for field in REQUIRED_FIELDS:
                 if field not in metrics_data:
                     logger.debug(f"RedisFlushWorker: Key {key} missing required field: {field}")
-                    return False
+                    return None
 
             # Validate data types and ranges
-            repository_id = int(metrics_data.get("repository_id", 0))
-            pull_count = int(metrics_data.get("pull_count", 0))
-            last_pull_timestamp = int(metrics_data.get("last_pull_timestamp", 0))
-
+            repository_id = int(metrics_data["repository_id"])
             if repository_id <= 0:
                 logger.debug(
                     f"RedisFlushWorker: Key {key} has invalid repository_id: {repository_id}"
                 )
-                return False
+                return None
+
+            pull_count = int(metrics_data["pull_count"])
+            last_pull_timestamp = int(metrics_data["last_pull_timestamp"])
 
             if pull_count < 0:  # 0 is valid for cleanup
                 logger.debug(f"RedisFlushWorker: Key {key} has invalid pull_count: {pull_count}")
-                return False
+                return None
 
             if last_pull_timestamp < 0:
                 logger.debug(
                     f"RedisFlushWorker: Key {key} has invalid timestamp: {last_pull_timestamp}"
                 )
-                return False
+                return None
 
-            manifest_digest = metrics_data.get("manifest_digest", "")
+            manifest_digest = metrics_data["manifest_digest"]
             if not manifest_digest:
                 logger.debug(f"RedisFlushWorker: Key {key} missing manifest_digest")
-                return False
+                return None
 
-            try:
-                Digest.parse_digest(manifest_digest)
-            except InvalidDigestException:
+            if not _is_valid_digest(manifest_digest):
                 logger.debug(
                     f"RedisFlushWorker: Key {key} has invalid manifest_digest: {manifest_digest}"
                 )
-                return False
+                return None
 
-            return True
+            return repository_id, pull_count, last_pull_timestamp
 
         except (ValueError, TypeError) as e:
             logger.debug(f"RedisFlushWorker: Key {key} has invalid data format: {e}")
-            return False
+            return None
+
+
+def _is_valid_digest(digest: str) -> bool:
+    """
+    Check that a digest has the algorithm:hex form accepted by Digest.parse_digest.
+
+    Uses character set checks rather than the regex, since this runs for every key flushed.
+    """
+    algorithm, separator, hex_bytes = digest.partition(":")
+    return (
+        bool(separator and algorithm and hex_bytes)
+        and _DIGEST_ALGORITHM_CHARS.issuperset(algorithm)
+        and _DIGEST_HEX_CHARS.issuperset(hex_bytes)
+    )
 
 
 def create_gunicorn_worker():
@@ -4,52 +4,57 @@ Tests for RedisFlushWorker.
 Tests the main worker that processes Redis pull events.
 """
 
+import os
 import sys
+import threading
 from typing import List, Set
 from unittest.mock import MagicMock, patch
 
+import fakeredis
+import pytest
 import redis
 
-from workers.pullstatsredisflushworker import RedisFlushWorker, create_gunicorn_worker
+from digest.digest_tools import Digest, InvalidDigestException
+from util.pullmetrics import PULL_EVENTS_PENDING_KEY
+from workers.pullstatsredisflushworker import (
+    CLAIM_PULL_EVENTS_SCRIPT,
+    REDIS_POOL,
+    RedisFlushWorker,
+    _is_valid_digest,
+    create_gunicorn_worker,
+)
+
+
+@pytest.fixture
+def fake_redis():
+    """In-memory Redis server with real command, pipeline and Lua script semantics."""
+    return fakeredis.FakeStrictRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+
+def _load_hashes(client, keys, hashes):
+    """Write each hash to its key as a producer would."""
+    for key, data in zip(keys, hashes):
+        client.hset(key, mapping=data)
+
+
+def _hash_reply(data):
+    """Flatten a hash into the field/value list returned by the claim script."""
+    return [item for field_value in data.items() for item in field_value]
 
 
 def test_redis_flush_worker_init():
     """Test RedisFlushWorker initialization."""
-    with patch("workers.pullstatsredisflushworker.app") as mock_app:
-        mock_app.config.get.side_effect = lambda key, default=None: {
-            "REDIS_FLUSH_INTERVAL_SECONDS": 300,
-            "REDIS_FLUSH_WORKER_BATCH_SIZE": 1000,
-            "REDIS_FLUSH_WORKER_SCAN_COUNT": 100,
-            "REDIS_CONNECTION_TIMEOUT": 5,
-            "PULL_METRICS_REDIS": {
-                "host": "localhost",
-                "port": 6379,
-                "db": 1,
-                "password": None,
-            },
-        }.get(key, default)
-
+    with patch("workers.pullstatsredisflushworker.POLL_PERIOD", 120):
         worker = RedisFlushWorker()
 
-        # Should have one operation scheduled
+        # Should have one operation scheduled at the configured flush interval
         assert len(worker._operations) == 1
-        # Note: Default frequency is 300, but may be overridden by config
-        assert worker._operations[0][1] in [30, 300]  # Allow for test config overrides
+        assert worker._operations[0][1] == 120
 
 
 def test_initialize_redis_client_success():
     """Test successful Redis client initialization."""
-    with patch("workers.pullstatsredisflushworker.app") as mock_app:
-        mock_app.config.get.side_effect = lambda key, default=None: {
-            "PULL_METRICS_REDIS": {
-                "host": "localhost",
-                "port": 6379,
-                "db": 1,
-                "password": None,
-            },
-            "REDIS_CONNECTION_TIMEOUT": 5,
-        }.get(key, default)
-
+    with patch("workers.pullstatsredisflushworker.app"):
         with patch("workers.pullstatsredisflushworker.redis") as mock_redis_module:
             # Mock Redis client
             mock_client = MagicMock()
@@ -61,23 +66,148 @@ def test_initialize_redis_client_success():
 
             # Verify
             assert worker.redis_client == mock_client
-            mock_redis_module.StrictRedis.assert_called_once()
+            mock_redis_module.StrictRedis.assert_called_once_with(connection_pool=REDIS_POOL)
             mock_client.ping.assert_called_once()
 
 
-def test_initialize_redis_client_connection_failure():
-    """Test Redis client initialization when connection fails."""
+def test_initialize_redis_client_shares_connection_pool():
+    """Test that every worker instance builds its client on the module connection pool."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
-        mock_app.config.get.side_effect = lambda key, default=None: {
-            "PULL_METRICS_REDIS": {
-                "host": "localhost",
-                "port": 6379,
-                "db": 1,
-                "password": None,
+        mock_app.config.get.return_value = 300
+
+        with patch("workers.pullstatsredisflushworker.redis") as mock_redis_module:
+            RedisFlushWorker()
+            RedisFlushWorker()
+
+            assert mock_redis_module.StrictRedis.call_count == 2
+            for call in mock_redis_module.StrictRedis.call_args_list:
+                assert call.kwargs == {"connection_pool": REDIS_POOL}
+
+    assert REDIS_POOL.connection_kwargs["socket_keepalive"] is True
+    assert REDIS_POOL.connection_kwargs["decode_responses"] is True
+
+
+def _fake_redis_pool(protocol=2):
+    """Build a connection pool on a fresh fakeredis server speaking the given protocol."""
+    return redis.ConnectionPool(
+        connection_class=fakeredis.FakeConnection,
+        server=fakeredis.FakeServer(),
+        decode_responses=True,
+        protocol=protocol,
+    )
+
+
+@pytest.fixture
+def fake_redis_pool():
+    """Connection pool on fakeredis, patched in as the worker's shared pool."""
+    pool = _fake_redis_pool()
+    with patch("workers.pullstatsredisflushworker.REDIS_POOL", pool):
+        yield pool
+
+
+def test_flush_pull_metrics_opens_dedicated_connection(fake_redis_pool):
+    """Test that the first flush swaps in a client with a dedicated connection."""
+    worker = RedisFlushWorker()
+    pooled_client = worker.redis_client
+    assert pooled_client.connection is None
+
+    worker._flush_pull_metrics()
+
+    dedicated_client = worker.redis_client
+    assert dedicated_client is not pooled_client
+    assert dedicated_client.connection_pool is fake_redis_pool
+    assert dedicated_client.connection is not None
+
+    # Later flushes in the same process keep the same client
+    worker._flush_pull_metrics()
+    assert worker.redis_client is dedicated_client
+
+
+def test_flush_pull_metrics_dedicated_connection_after_fork(fake_redis_pool):
+    """Test that a worker built before a fork flushes over a connection owned by the child."""
+    worker = RedisFlushWorker()
+    worker._flush_pull_metrics()
+    parent_connection = worker.redis_client.connection
+
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 1
+        try:
+            worker._flush_pull_metrics()
+            connection = worker.redis_client.connection
+            if connection is not parent_connection and connection.pid == os.getpid():
+                exit_code = 0
+        finally:
+            os._exit(exit_code)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert worker.redis_client.connection is parent_connection
+
+
+def test_connection_pool_uses_hiredis_and_resp2_by_default():
+    """Test that pooled connections default to RESP2 and hiredis is available to parse replies."""
+    assert redis.utils.HIREDIS_AVAILABLE
+    assert REDIS_POOL.connection_kwargs["protocol"] == 2
+
+
+def test_flush_pull_metrics_over_resp3():
+    """Test a full scan, claim, flush and unlink cycle with the pool speaking RESP3."""
+    pool = _fake_redis_pool(protocol=3)
+    client = redis.StrictRedis(connection_pool=pool)
+    tag_key = "pull_events:repo:123:tag:latest:sha256:abc123"
+    orphaned_key = "pull_events:repo:123:digest:sha256:abc123:processing:1694168000000:deadbeef"
+    _load_hashes(
+        client,
+        [tag_key, orphaned_key],
+        [
+            {
+                "repository_id": "123",
+                "tag_name": "latest",
+                "manifest_digest": "sha256:abc123",
+                "pull_count": "5",
+                "last_pull_timestamp": "1694168400",
+                "pull_method": "tag",
+            },
+            {
+                "repository_id": "123",
+                "tag_name": "",
+                "manifest_digest": "sha256:abc123",
+                "pull_count": "2",
+                "last_pull_timestamp": "1694168000",
+                "pull_method": "digest",
             },
-            "REDIS_CONNECTION_TIMEOUT": 5,
-        }.get(key, default)
+        ],
+    )
+
+    with (
+        patch("workers.pullstatsredisflushworker.REDIS_POOL", pool),
+        patch(
+            "workers.pullstatsredisflushworker.bulk_upsert_tag_statistics", return_value=1
+        ) as mock_tag_upsert,
+        patch(
+            "workers.pullstatsredisflushworker.bulk_upsert_manifest_statistics", return_value=1
+        ) as mock_manifest_upsert,
+    ):
+        worker = RedisFlushWorker()
+        worker._flush_pull_metrics()
+
+        assert worker.redis_client.connection.protocol == 3
+
+    (tag_updates,) = mock_tag_upsert.call_args.args
+    assert [(u["repository_id"], u["tag_name"], u["pull_count"]) for u in tag_updates] == [
+        (123, "latest", 5)
+    ]
+    (manifest_updates,) = mock_manifest_upsert.call_args.args
+    assert [
+        (u["repository_id"], u["manifest_digest"], u["pull_count"]) for u in manifest_updates
+    ] == [(123, "sha256:abc123", 7)]
+    assert client.keys("*") == []
 
+
+def test_initialize_redis_client_connection_failure():
+    """Test Redis client initialization when connection fails."""
+    with patch("workers.pullstatsredisflushworker.app"):
         with patch("workers.pullstatsredisflushworker.redis") as mock_redis_module:
             import redis
 
@@ -99,17 +229,7 @@ def test_initialize_redis_client_connection_failure():
 
 def test_initialize_redis_client_redis_error():
     """Test Redis client initialization when a general Redis error occurs."""
-    with patch("workers.pullstatsredisflushworker.app") as mock_app:
-        mock_app.config.get.side_effect = lambda key, default=None: {
-            "PULL_METRICS_REDIS": {
-                "host": "localhost",
-                "port": 6379,
-                "db": 1,
-                "password": None,
-            },
-            "REDIS_CONNECTION_TIMEOUT": 5,
-        }.get(key, default)
-
+    with patch("workers.pullstatsredisflushworker.app"):
         with patch("workers.pullstatsredisflushworker.redis") as mock_redis_module:
             import redis
 
@@ -131,11 +251,7 @@ def test_initialize_redis_client_redis_error():
 
 def test_initialize_redis_client_no_config():
     """Test Redis client initialization when PULL_METRICS_REDIS is not configured."""
-    with patch("workers.pullstatsredisflushworker.app") as mock_app:
-        mock_app.config.get.side_effect = lambda key, default=None: {
-            "REDIS_CONNECTION_TIMEOUT": 5,
-        }.get(key, default)
-
+    with patch("workers.pullstatsredisflushworker.app"):
         with patch("workers.pullstatsredisflushworker.redis") as mock_redis_module:
             # Mock Redis client
             mock_client = MagicMock()
@@ -162,23 +278,27 @@ def test_process_redis_events():
         worker.redis_client = mock_client
 
         # Mock Redis data
-        mock_client.hgetall.side_effect = [
-            {
-                "repository_id": "123",
-                "tag_name": "latest",
-                "manifest_digest": "sha256:abc123",
-                "pull_count": "5",
-                "last_pull_timestamp": "1694168400",
-                "pull_method": "tag",
-            },
-            {
-                "repository_id": "456",
-                "tag_name": "",
-                "manifest_digest": "sha256:def456",
-                "pull_count": "3",
-                "last_pull_timestamp": "1694168460",
-                "pull_method": "digest",
-            },
+        mock_client.pipeline.return_value.execute.return_value = [
+            _hash_reply(
+                {
+                    "repository_id": "123",
+                    "tag_name": "latest",
+                    "manifest_digest": "sha256:abc123",
+                    "pull_count": "5",
+                    "last_pull_timestamp": "1694168400",
+                    "pull_method": "tag",
+                }
+            ),
+            _hash_reply(
+                {
+                    "repository_id": "456",
+                    "tag_name": "",
+                    "manifest_digest": "sha256:def456",
+                    "pull_count": "3",
+                    "last_pull_timestamp": "1694168460",
+                    "pull_method": "digest",
+                }
+            ),
         ]
 
         # Test keys
@@ -187,9 +307,6 @@ def test_process_redis_events():
             "pull_events:repo:456:digest:sha256:def456",
         ]
 
-        # Mock RENAME operation (atomic claim of keys)
-        mock_client.rename.return_value = None  # RENAME succeeds
-
         # Test processing
         (
             tag_updates,
@@ -209,6 +326,148 @@ def test_process_redis_events():
         assert tag_update["pull_count"] == 5
         assert tag_update["manifest_digest"] == "sha256:abc123"
 
+        # Both keys are claimed and read with a single pipelined round trip
+        mock_client.rename.assert_not_called()
+        mock_client.hgetall.assert_not_called()
+        mock_client.register_script.assert_called_once_with(CLAIM_PULL_EVENTS_SCRIPT)
+        mock_client.pipeline.assert_called_once_with(transaction=False)
+        mock_client.pipeline.return_value.execute.assert_called_once_with(raise_on_error=False)
+
+        claim_script = mock_client.register_script.return_value
+        assert claim_script.call_count == 2
+        for call, key in zip(claim_script.call_args_list, keys):
+            original_key, processing_key = call.kwargs["keys"]
+            assert original_key == key
+            assert processing_key.startswith(f"{key}:processing:")
+            assert call.kwargs["client"] == mock_client.pipeline.return_value
+
+
+def test_claim_keys_chunks_pipeline():
+    """Test that keys are claimed in pipelines of bounded size."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        mock_client = MagicMock()
+        mock_client.pipeline.return_value.execute.side_effect = [
+            [["pull_count", "1"], ["pull_count", "2"]],
+            [["pull_count", "3"]],
+        ]
+        worker.redis_client = mock_client
+
+        claimed_keys = [("key1", "key1:p"), ("key2", "key2:p"), ("key3", "key3:p")]
+        with patch("workers.pullstatsredisflushworker.REDIS_PIPELINE_CHUNK_SIZE", 2):
+            results = worker._claim_keys(claimed_keys)
+
+        assert results == [{"pull_count": "1"}, {"pull_count": "2"}, {"pull_count": "3"}]
+        assert mock_client.register_script.return_value.call_count == 3
+        assert mock_client.pipeline.return_value.execute.call_count == 2
+
+        # The script is registered once per worker
+        mock_client.pipeline.return_value.execute.side_effect = None
+        mock_client.pipeline.return_value.execute.return_value = [["pull_count", "1"]]
+        worker._claim_keys(claimed_keys[:1])
+        mock_client.register_script.assert_called_once()
+
+
+def test_process_redis_events_deduplicates_keys():
+    """Test that a key repeated in the input is claimed only once."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        mock_client = MagicMock()
+        mock_client.pipeline.return_value.execute.return_value = [
+            _hash_reply(
+                {
+                    "repository_id": "123",
+                    "tag_name": "latest",
+                    "manifest_digest": "sha256:abc123",
+                    "pull_count": "5",
+                    "last_pull_timestamp": "1694168400",
+                    "pull_method": "tag",
+                }
+            )
+        ]
+        worker.redis_client = mock_client
+
+        key = "pull_events:repo:123:tag:latest:sha256:abc123"
+        tag_updates, manifest_updates, cleanup_keys = worker._process_redis_events([key, key, key])
+
+        assert mock_client.register_script.return_value.call_count == 1
+        assert len(tag_updates) == 1
+        assert tag_updates[0]["pull_count"] == 5
+        assert len(manifest_updates) == 1
+        assert len(cleanup_keys) == 1
+
+
+def test_claim_keys_missing_and_failed_keys():
+    """Test that keys which vanished or failed to claim are reported as None."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        mock_client = MagicMock()
+        mock_client.pipeline.return_value.execute.return_value = [
+            None,
+            redis.ResponseError("WRONGTYPE Operation against a key holding the wrong kind"),
+        ]
+        worker.redis_client = mock_client
+
+        results = worker._claim_keys([("key1", "key1:p"), ("key2", "key2:p")])
+
+        assert results == [None, None]
+
+
+def test_process_redis_events_missing_key():
+    """Test that a key which no longer exists is neither flushed nor cleaned up."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        mock_client = MagicMock()
+        mock_client.pipeline.return_value.execute.return_value = [None]
+        worker.redis_client = mock_client
+
+        keys = ["pull_events:repo:123:tag:latest:sha256:abc"]
+        tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
+
+        assert tag_updates == []
+        assert manifest_updates == []
+        assert db_dependent == set()
+        mock_client.pipeline.return_value.unlink.assert_not_called()
+
+
+def test_process_redis_events_orphaned_processing_key():
+    """Test that an orphaned processing key is read in place rather than renamed."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        mock_client = MagicMock()
+        mock_client.pipeline.return_value.execute.return_value = [
+            _hash_reply(
+                {
+                    "repository_id": "123",
+                    "tag_name": "",
+                    "manifest_digest": "sha256:abc123",
+                    "pull_count": "2",
+                    "last_pull_timestamp": "1694168400",
+                    "pull_method": "digest",
+                }
+            )
+        ]
+        worker.redis_client = mock_client
+
+        orphaned_key = "pull_events:repo:123:digest:sha256:abc123:processing:1694168400000:abcd1234"
+        tag_updates, manifest_updates, db_dependent = worker._process_redis_events([orphaned_key])
+
+        mock_client.register_script.return_value.assert_called_once_with(
+            keys=[orphaned_key, orphaned_key], client=mock_client.pipeline.return_value
+        )
+        assert db_dependent == {orphaned_key}
+        assert manifest_updates[0]["pull_count"] == 2
+
 
 def test_cleanup_redis_keys_success():
     """Test successful Redis key cleanup."""
@@ -219,17 +478,21 @@ def test_cleanup_redis_keys_success():
 
         # Mock Redis client
         mock_client = MagicMock()
-        mock_client.delete.return_value = 3  # Simulate successful deletion of 3 keys
+        mock_pipeline = mock_client.pipeline.return_value
+        mock_pipeline.execute.return_value = [3]  # Simulate successful deletion of 3 keys
         worker.redis_client = mock_client
 
         # Test cleanup
         test_keys = {"key1", "key2", "key3"}
         worker._cleanup_redis_keys(test_keys)
 
-        # Verify delete was called with the correct keys (order doesn't matter for sets)
-        mock_client.delete.assert_called_once()
-        called_args = mock_client.delete.call_args[0]  # Get the positional arguments
+        # Verify unlink was pipelined with the correct keys (order doesn't matter for sets)
+        mock_client.delete.assert_not_called()
+        mock_client.pipeline.assert_called_once_with(transaction=False)
+        mock_pipeline.unlink.assert_called_once()
+        called_args = mock_pipeline.unlink.call_args[0]  # Get the positional arguments
         assert set(called_args) == test_keys
+        mock_pipeline.execute.assert_called_once_with(raise_on_error=False)
 
 
 def test_cleanup_redis_keys_no_client():
@@ -246,7 +509,7 @@ def test_cleanup_redis_keys_no_client():
         worker._cleanup_redis_keys(keys_to_clean)  # Should not raise exception
 
 
-def test_validate_redis_key_data():
+def test_parse_redis_key_data():
     """Test Redis key data validation."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -260,7 +523,7 @@ def test_validate_redis_key_data():
             "pull_count": "5",
             "last_pull_timestamp": "1694168400",
         }
-        assert worker._validate_redis_key_data("test_key", valid_data) is True
+        assert worker._parse_redis_key_data("test_key", valid_data) is not None
 
         # Missing required field
         invalid_data = {
@@ -269,7 +532,7 @@ def test_validate_redis_key_data():
             "last_pull_timestamp": "1694168400",
             # missing manifest_digest
         }
-        assert worker._validate_redis_key_data("test_key", invalid_data) is False
+        assert worker._parse_redis_key_data("test_key", invalid_data) is None
 
         # Invalid repository_id
         invalid_data = {
@@ -278,7 +541,7 @@ def test_validate_redis_key_data():
             "pull_count": "5",
             "last_pull_timestamp": "1694168400",
         }
-        assert worker._validate_redis_key_data("test_key", invalid_data) is False
+        assert worker._parse_redis_key_data("test_key", invalid_data) is None
 
         # Invalid manifest digest
         invalid_data = {
@@ -287,7 +550,7 @@ def test_validate_redis_key_data():
             "pull_count": "5",
             "last_pull_timestamp": "1694168400",
         }
-        assert worker._validate_redis_key_data("test_key", invalid_data) is False
+        assert worker._parse_redis_key_data("test_key", invalid_data) is None
 
         # Invalid digest format (missing colon)
         invalid_data = {
@@ -296,10 +559,38 @@ def test_validate_redis_key_data():
             "pull_count": "5",
             "last_pull_timestamp": "1694168400",
         }
-        assert worker._validate_redis_key_data("test_key", invalid_data) is False
-
-
-def test_scan_redis_keys_no_client():
+        assert worker._parse_redis_key_data("test_key", invalid_data) is None
+
+
+@pytest.mark.parametrize(
+    "digest",
+    [
+        "sha256:abc123",
+        "sha256:" + "a" * 64,
+        "sha512:ABCDEF0123",
+        "sha256+b64u.x_y-z:00",
+        "invalid_digest",
+        "sha256123123",
+        "sha256:",
+        ":abc123",
+        "sha256:xyz",
+        "sha256:abc:123",
+        "sha/256:abc123",
+        "",
+    ],
+)
+def test_is_valid_digest_matches_digest_parser(digest):
+    """Test that the digest check accepts exactly what Digest.parse_digest accepts."""
+    try:
+        Digest.parse_digest(digest)
+        expected = True
+    except InvalidDigestException:
+        expected = False
+
+    assert _is_valid_digest(digest) is expected
+
+
+def test_iter_event_keys_no_client():
     """Test Redis key scanning when client is None."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -307,11 +598,11 @@ def test_scan_redis_keys_no_client():
         worker = RedisFlushWorker()
         worker.redis_client = None
 
-        result = worker._scan_redis_keys("pull_events:*", 10)
+        result = [key for batch in worker._iter_event_keys("pull_events:*", 10) for key in batch]
         assert result == []
 
 
-def test_scan_redis_keys_success():
+def test_iter_event_keys_success():
     """Test successful Redis key scanning."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -321,14 +612,14 @@ def test_scan_redis_keys_success():
         mock_client.scan.return_value = (0, ["key1", "key2", "key3"])
         worker.redis_client = mock_client
 
-        result = worker._scan_redis_keys("pull_events:*", 10)
+        result = [key for batch in worker._iter_event_keys("pull_events:*", 10) for key in batch]
 
         assert len(result) == 3
         assert set(result) == {"key1", "key2", "key3"}
         mock_client.scan.assert_called_once_with(cursor=0, match="pull_events:*", count=100)
 
 
-def test_scan_redis_keys_empty_results():
+def test_iter_event_keys_empty_results():
     """Test Redis key scanning when no keys are found."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -338,13 +629,13 @@ def test_scan_redis_keys_empty_results():
         mock_client.scan.return_value = (0, [])
         worker.redis_client = mock_client
 
-        result = worker._scan_redis_keys("pull_events:*", 10)
+        result = [key for batch in worker._iter_event_keys("pull_events:*", 10) for key in batch]
 
         assert result == []
         mock_client.scan.assert_called_once_with(cursor=0, match="pull_events:*", count=100)
 
 
-def test_scan_redis_keys_multiple_batches():
+def test_iter_event_keys_multiple_batches():
     """Test Redis key scanning with multiple scan batches."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -358,7 +649,7 @@ def test_scan_redis_keys_multiple_batches():
         ]
         worker.redis_client = mock_client
 
-        result = worker._scan_redis_keys("pull_events:*", 10)
+        result = [key for batch in worker._iter_event_keys("pull_events:*", 10) for key in batch]
 
         # Verify all keys are returned
         assert len(result) == 5
@@ -375,8 +666,8 @@ def test_scan_redis_keys_multiple_batches():
             assert call.kwargs == expected_calls[i]
 
 
-def test_scan_redis_keys_limit_reached():
-    """Test Redis key scanning stops when limit is reached."""
+def test_iter_event_keys_batch_size_reached():
+    """Test Redis key scanning yields a batch once batch size is reached."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
@@ -388,10 +679,11 @@ def test_scan_redis_keys_limit_reached():
         ]
         worker.redis_client = mock_client
 
-        # Test with limit of 4
-        result = worker._scan_redis_keys("pull_events:*", 4)
+        # Test with a batch size of 4
+        batches = worker._iter_event_keys("pull_events:*", 4)
+        result = next(batches)
 
-        # Verify only limit number of keys are returned
+        # Verify only batch size number of keys are returned
         assert len(result) == 4
         assert set(result).issubset({"key1", "key2", "key3", "key4", "key5", "key6"})
 
@@ -399,7 +691,34 @@ def test_scan_redis_keys_limit_reached():
         assert mock_client.scan.call_count >= 1
 
 
-def test_scan_redis_keys_deduplication():
+def test_iter_event_keys_prefetches_next_batch():
+    """Test that the next batch is scanned while the caller still holds the current one."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        mock_client = MagicMock()
+        second_scan = threading.Event()
+
+        def scan(cursor, match, count):
+            if cursor == 0:
+                return 10, ["key1", "key2"]
+            second_scan.set()
+            return 0, ["key3"]
+
+        mock_client.scan.side_effect = scan
+        worker.redis_client = mock_client
+
+        batches = worker._iter_event_keys("pull_events:*", 2)
+        assert next(batches) == ["key1", "key2"]
+
+        # The second SCAN runs without the caller asking for the next batch
+        assert second_scan.wait(timeout=5)
+        assert next(batches) == ["key3"]
+        assert list(batches) == []
+
+
+def test_iter_event_keys_deduplication():
     """Test Redis key scanning deduplicates keys properly."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -412,14 +731,14 @@ def test_scan_redis_keys_deduplication():
         ]
         worker.redis_client = mock_client
 
-        result = worker._scan_redis_keys("pull_events:*", 10)
+        result = [key for batch in worker._iter_event_keys("pull_events:*", 10) for key in batch]
 
         # Verify deduplication
         assert len(result) == 3
         assert set(result) == {"key1", "key2", "key3"}
 
 
-def test_scan_redis_keys_redis_error():
+def test_iter_event_keys_redis_error():
     """Test Redis key scanning handles Redis errors."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -429,13 +748,13 @@ def test_scan_redis_keys_redis_error():
         mock_client.scan.side_effect = redis.RedisError("Connection lost")
         worker.redis_client = mock_client
 
-        result = worker._scan_redis_keys("pull_events:*", 10)
+        result = [key for batch in worker._iter_event_keys("pull_events:*", 10) for key in batch]
 
         # Verify error is handled gracefully
         assert result == []
 
 
-def test_scan_redis_keys_general_exception():
+def test_iter_event_keys_general_exception():
     """Test Redis key scanning handles general exceptions."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -445,13 +764,13 @@ def test_scan_redis_keys_general_exception():
         mock_client.scan.side_effect = Exception("Unexpected error")
         worker.redis_client = mock_client
 
-        result = worker._scan_redis_keys("pull_events:*", 10)
+        result = [key for batch in worker._iter_event_keys("pull_events:*", 10) for key in batch]
 
         # Verify error is handled gracefully
         assert result == []
 
 
-def test_scan_redis_keys_empty_batch_in_middle():
+def test_iter_event_keys_empty_batch_in_middle():
     """Test Redis key scanning handles empty batches in the middle of scanning."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -465,7 +784,7 @@ def test_scan_redis_keys_empty_batch_in_middle():
         ]
         worker.redis_client = mock_client
 
-        result = worker._scan_redis_keys("pull_events:*", 10)
+        result = [key for batch in worker._iter_event_keys("pull_events:*", 10) for key in batch]
 
         # Verify all non-empty batches are processed
         assert len(result) == 3
@@ -695,7 +1014,7 @@ def test_flush_pull_metrics_no_keys_found():
         mock_client.scan.assert_called_once()
 
 
-def test_flush_pull_metrics_successful_processing():
+def test_flush_pull_metrics_successful_processing(fake_redis):
     """Test successful _flush_pull_metrics execution."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -710,34 +1029,151 @@ def test_flush_pull_metrics_successful_processing():
                 mock_manifest_upsert.return_value = 1
 
                 worker = RedisFlushWorker()
-                mock_client = MagicMock()
-
-                # Mock scan to return a key
-                mock_client.scan.return_value = (0, ["pull_events:repo:123:tag:latest:sha256:abc"])
+                worker.redis_client = fake_redis
 
-                # Mock hgetall to return valid data
-                mock_client.hgetall.return_value = {
-                    "repository_id": "123",
-                    "tag_name": "latest",
-                    "manifest_digest": "sha256:abc123",
-                    "pull_count": "5",
-                    "last_pull_timestamp": "1694168400",
-                    "pull_method": "tag",
-                }
-
-                # Mock delete to succeed
-                mock_client.delete.return_value = 1
-
-                worker.redis_client = mock_client
+                fake_redis.hset(
+                    "pull_events:repo:123:tag:latest:sha256:abc123",
+                    mapping={
+                        "repository_id": "123",
+                        "tag_name": "latest",
+                        "manifest_digest": "sha256:abc123",
+                        "pull_count": "5",
+                        "last_pull_timestamp": "1694168400",
+                        "pull_method": "tag",
+                    },
+                )
+                fake_redis.set(PULL_EVENTS_PENDING_KEY, 1)
 
                 worker._flush_pull_metrics()
 
                 # Verify database operations were called
                 mock_tag_upsert.assert_called_once()
+                (tag_updates,) = mock_tag_upsert.call_args.args
+                assert [
+                    (u["repository_id"], u["tag_name"], u["pull_count"]) for u in tag_updates
+                ] == [(123, "latest", 5)]
                 mock_manifest_upsert.assert_called_once()
 
-                # Verify cleanup was called
-                mock_client.delete.assert_called()
+                # The claimed key and the pending flag are both gone
+                assert fake_redis.keys("*") == []
+
+
+def test_flush_pull_metrics_retries_keys_after_database_failure(fake_redis):
+    """Test that keys claimed by a failed flush are picked up again by the next cycle."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        worker.redis_client = fake_redis
+
+        key = "pull_events:repo:123:digest:sha256:abc123"
+        fake_redis.hset(
+            key,
+            mapping={
+                "repository_id": "123",
+                "manifest_digest": "sha256:abc123",
+                "pull_count": "2",
+                "last_pull_timestamp": "1694168400",
+                "pull_method": "digest",
+            },
+        )
+
+        with patch(
+            "workers.pullstatsredisflushworker.bulk_upsert_manifest_statistics"
+        ) as mock_manifest_upsert:
+            mock_manifest_upsert.return_value = 0
+            worker._flush_pull_metrics()
+
+            # The key stays claimed under its processing name and the flag asks for a retry
+            (processing_key,) = fake_redis.keys("pull_events:*")
+            assert processing_key.startswith(f"{key}:processing:")
+            assert fake_redis.exists(PULL_EVENTS_PENDING_KEY)
+
+            mock_manifest_upsert.return_value = 1
+            worker._flush_pull_metrics()
+
+        (manifest_updates,) = mock_manifest_upsert.call_args.args
+        assert manifest_updates[0]["pull_count"] == 2
+        assert fake_redis.keys("*") == []
+
+
+def test_flush_pull_metrics_rescans_after_claim_failure(fake_redis):
+    """Test that a key whose claim fails is scanned for again by the next cycle."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        worker.redis_client = fake_redis
+
+        # HGETALL in the claim script fails on a key that is not a hash
+        fake_redis.set("pull_events:repo:123:digest:sha256:abc123", "not-a-hash")
+        worker._flush_pull_metrics()
+
+        assert fake_redis.exists(PULL_EVENTS_PENDING_KEY)
+
+        with patch.object(fake_redis, "scan", wraps=fake_redis.scan) as mock_scan:
+            worker._flush_pull_metrics()
+
+        assert mock_scan.called
+
+
+def test_flush_pull_metrics_rescans_after_key_processing_error(fake_redis):
+    """Test that a key left behind by a processing error is flushed by the next cycle."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        worker.redis_client = fake_redis
+
+        key = "pull_events:repo:123:digest:sha256:abc123"
+        fake_redis.hset(
+            key,
+            mapping={
+                "repository_id": "123",
+                "manifest_digest": "sha256:abc123",
+                "pull_count": "2",
+                "last_pull_timestamp": "1694168400",
+                "pull_method": "digest",
+            },
+        )
+
+        with patch(
+            "workers.pullstatsredisflushworker.bulk_upsert_manifest_statistics", return_value=1
+        ) as mock_manifest_upsert:
+            with patch.object(worker, "_parse_redis_key_data", side_effect=RuntimeError("boom")):
+                worker._flush_pull_metrics()
+
+            # The claimed key is kept and the flag asks for another scan
+            (processing_key,) = fake_redis.keys("pull_events:*")
+            assert processing_key.startswith(f"{key}:processing:")
+            assert fake_redis.exists(PULL_EVENTS_PENDING_KEY)
+            mock_manifest_upsert.assert_not_called()
+
+            worker._flush_pull_metrics()
+
+        (manifest_updates,) = mock_manifest_upsert.call_args.args
+        assert manifest_updates[0]["pull_count"] == 2
+        assert fake_redis.keys("*") == []
+
+
+def test_flush_pull_metrics_processes_batches_until_database_failure():
+    """Test _flush_pull_metrics flushes each scanned batch and stops on a database failure."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        worker.redis_client = MagicMock()
+        worker.redis_client.scan.return_value = (0, ["key1", "key2", "key3"])
+
+        with patch("workers.pullstatsredisflushworker.BATCH_SIZE", 1):
+            with patch.object(worker, "_flush_key_batch") as mock_flush_key_batch:
+                mock_flush_key_batch.side_effect = [True, False, True]
+                worker._flush_pull_metrics()
+
+        assert mock_flush_key_batch.call_args_list == [
+            ((["key1"],),),
+            ((["key2"],),),
+        ]
 
 
 def test_flush_pull_metrics_with_redis_error():
@@ -761,15 +1197,18 @@ def test_cleanup_redis_keys_batch_processing():
 
         worker = RedisFlushWorker()
         mock_client = MagicMock()
-        mock_client.delete.return_value = 100  # Successful deletion
+        mock_pipeline = mock_client.pipeline.return_value
+        mock_pipeline.execute.return_value = [500, 500, 250]  # Successful deletion
         worker.redis_client = mock_client
 
-        # Create 250 keys (should be split into 3 batches of 100, 100, 50)
-        keys = {f"key{i}" for i in range(250)}
+        # Create 1250 keys (should be split into 3 batches of 500, 500, 250)
+        keys = {f"key{i}" for i in range(1250)}
         worker._cleanup_redis_keys(keys)
 
-        # Verify delete was called 3 times (3 batches)
-        assert mock_client.delete.call_count == 3
+        # Verify unlink was called 3 times (3 batches) in a single pipeline
+        assert mock_pipeline.unlink.call_count == 3
+        assert [len(call.args) for call in mock_pipeline.unlink.call_args_list] == [500, 500, 250]
+        mock_pipeline.execute.assert_called_once()
 
 
 def test_cleanup_redis_keys_partial_deletion():
@@ -780,14 +1219,14 @@ def test_cleanup_redis_keys_partial_deletion():
         worker = RedisFlushWorker()
         mock_client = MagicMock()
         # Return fewer deletions than requested
-        mock_client.delete.return_value = 50  # Only 50 out of 100 deleted
+        mock_client.pipeline.return_value.execute.return_value = [50]  # Only 50 out of 100 deleted
         worker.redis_client = mock_client
 
         keys = {f"key{i}" for i in range(100)}
         worker._cleanup_redis_keys(keys)
 
         # Should still complete without raising exception
-        mock_client.delete.assert_called_once()
+        mock_client.pipeline.return_value.unlink.assert_called_once()
 
 
 def test_cleanup_redis_keys_batch_exception():
@@ -798,17 +1237,19 @@ def test_cleanup_redis_keys_batch_exception():
         worker = RedisFlushWorker()
         mock_client = MagicMock()
         # First batch fails, second succeeds
-        mock_client.delete.side_effect = [
-            Exception("First batch error"),
+        mock_client.pipeline.return_value.execute.return_value = [
+            redis.ResponseError("First batch error"),
             100,  # Second batch succeeds
         ]
         worker.redis_client = mock_client
 
-        keys = {f"key{i}" for i in range(150)}
-        worker._cleanup_redis_keys(keys)
+        keys = {f"key{i}" for i in range(600)}
+        with patch("workers.pullstatsredisflushworker.logger") as mock_logger:
+            worker._cleanup_redis_keys(keys)
 
         # Should handle error and continue
-        assert mock_client.delete.call_count == 2
+        assert mock_client.pipeline.return_value.unlink.call_count == 2
+        assert mock_logger.warning.call_count == 2
 
 
 def test_cleanup_redis_keys_redis_error():
@@ -818,7 +1259,7 @@ def test_cleanup_redis_keys_redis_error():
 
         worker = RedisFlushWorker()
         mock_client = MagicMock()
-        mock_client.delete.side_effect = redis.RedisError("Connection error")
+        mock_client.pipeline.return_value.execute.side_effect = redis.RedisError("Connection error")
         worker.redis_client = mock_client
 
         keys = {"key1", "key2"}
@@ -851,44 +1292,43 @@ def test_process_redis_events_empty_hash_data():
 
         worker = RedisFlushWorker()
         mock_client = MagicMock()
-        mock_client.hgetall.return_value = {}  # Empty data
+        mock_client.pipeline.return_value.execute.return_value = [_hash_reply({})]  # Empty data
         worker.redis_client = mock_client
 
         keys = ["pull_events:repo:123:tag:latest:sha256:abc"]
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Empty data should be cleaned up immediately (not in db_dependent)
         assert len(db_dependent) == 0
 
 
-def test_process_redis_events_zero_pull_count():
+def test_process_redis_events_zero_pull_count(fake_redis):
     """Test _process_redis_events with zero pull count."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        mock_client.hgetall.return_value = {
-            "repository_id": "123",
-            "tag_name": "latest",
-            "manifest_digest": "sha256:abc123",
-            "pull_count": "0",  # Zero pulls
-            "last_pull_timestamp": "1694168400",
-            "pull_method": "tag",
-        }
-        worker.redis_client = mock_client
+        hashes = [
+            {
+                "repository_id": "123",
+                "tag_name": "latest",
+                "manifest_digest": "sha256:abc123",
+                "pull_count": "0",  # Zero pulls
+                "last_pull_timestamp": "1694168400",
+                "pull_method": "tag",
+            }
+        ]
+        worker.redis_client = fake_redis
 
         keys = ["pull_events:repo:123:tag:latest:sha256:abc"]
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Zero pull count should be cleaned up immediately
         assert len(db_dependent) == 0
         assert len(tag_updates) == 0
         assert len(manifest_updates) == 0
+        assert fake_redis.keys("pull_events:*") == []
 
 
 def test_process_redis_events_redis_error_during_processing():
@@ -898,7 +1338,7 @@ def test_process_redis_events_redis_error_during_processing():
 
         worker = RedisFlushWorker()
         mock_client = MagicMock()
-        mock_client.hgetall.side_effect = redis.RedisError("Connection error")
+        mock_client.pipeline.return_value.execute.side_effect = redis.RedisError("Connection error")
         worker.redis_client = mock_client
 
         keys = ["pull_events:repo:123:tag:latest:sha256:abc"]
@@ -909,26 +1349,26 @@ def test_process_redis_events_redis_error_during_processing():
         assert len(manifest_updates) == 0
 
 
-def test_process_redis_events_digest_pull():
+def test_process_redis_events_digest_pull(fake_redis):
     """Test _process_redis_events with digest pull (no tag)."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        mock_client.hgetall.return_value = {
-            "repository_id": "123",
-            "tag_name": "",  # No tag for digest pull
-            "manifest_digest": "sha256:abc123",
-            "pull_count": "5",
-            "last_pull_timestamp": "1694168400",
-            "pull_method": "digest",
-        }
-        worker.redis_client = mock_client
+        hashes = [
+            {
+                "repository_id": "123",
+                "tag_name": "",  # No tag for digest pull
+                "manifest_digest": "sha256:abc123",
+                "pull_count": "5",
+                "last_pull_timestamp": "1694168400",
+                "pull_method": "digest",
+            }
+        ]
+        worker.redis_client = fake_redis
 
         keys = ["pull_events:repo:123:digest:sha256:abc"]
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Should only have manifest update, no tag update
@@ -961,17 +1401,7 @@ def test_flush_to_database_pull_statistics_exception():
 
 def test_initialize_redis_client_general_exception():
     """Test _initialize_redis_client handles general exceptions."""
-    with patch("workers.pullstatsredisflushworker.app") as mock_app:
-        mock_app.config.get.side_effect = lambda key, default=None: {
-            "PULL_METRICS_REDIS": {
-                "host": "localhost",
-                "port": 6379,
-                "db": 1,
-                "password": None,
-            },
-            "REDIS_CONNECTION_TIMEOUT": 5,
-        }.get(key, default)
-
+    with patch("workers.pullstatsredisflushworker.app"):
         with patch("workers.pullstatsredisflushworker.redis") as mock_redis_module:
             # Mock Redis client that fails with general exception
             mock_client = MagicMock()
@@ -989,8 +1419,27 @@ def test_initialize_redis_client_general_exception():
             assert worker.redis_client is None
 
 
-def test_validate_redis_key_data_type_error():
-    """Test _validate_redis_key_data handles type conversion errors."""
+def test_parse_redis_key_data_returns_integer_fields():
+    """Test _parse_redis_key_data returns the parsed integer fields of valid data."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+
+        valid_data = {
+            "repository_id": "123",
+            "manifest_digest": "sha256:abc123",
+            "pull_count": "5",
+            "last_pull_timestamp": "1694168400",
+        }
+        assert worker._parse_redis_key_data("test_key", valid_data) == (123, 5, 1694168400)
+
+        invalid_data = dict(valid_data, repository_id="0")
+        assert worker._parse_redis_key_data("test_key", invalid_data) is None
+
+
+def test_parse_redis_key_data_type_error():
+    """Test _parse_redis_key_data handles type conversion errors."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
@@ -1003,11 +1452,11 @@ def test_validate_redis_key_data_type_error():
             "pull_count": "not_a_number",
             "last_pull_timestamp": "1694168400",
         }
-        assert worker._validate_redis_key_data("test_key", invalid_data) is False
+        assert worker._parse_redis_key_data("test_key", invalid_data) is None
 
 
-def test_validate_redis_key_data_negative_values():
-    """Test _validate_redis_key_data handles negative values correctly."""
+def test_parse_redis_key_data_negative_values():
+    """Test _parse_redis_key_data handles negative values correctly."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
@@ -1020,7 +1469,7 @@ def test_validate_redis_key_data_negative_values():
             "pull_count": "-1",
             "last_pull_timestamp": "1694168400",
         }
-        assert worker._validate_redis_key_data("test_key", invalid_data) is False
+        assert worker._parse_redis_key_data("test_key", invalid_data) is None
 
         # Negative timestamp
         invalid_data = {
@@ -1029,11 +1478,11 @@ def test_validate_redis_key_data_negative_values():
             "pull_count": "5",
             "last_pull_timestamp": "-1",
         }
-        assert worker._validate_redis_key_data("test_key", invalid_data) is False
+        assert worker._parse_redis_key_data("test_key", invalid_data) is None
 
 
-def test_validate_redis_key_data_empty_digest():
-    """Test _validate_redis_key_data with empty manifest digest."""
+def test_parse_redis_key_data_empty_digest():
+    """Test _parse_redis_key_data with empty manifest digest."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
@@ -1046,10 +1495,10 @@ def test_validate_redis_key_data_empty_digest():
             "pull_count": "5",
             "last_pull_timestamp": "1694168400",
         }
-        assert worker._validate_redis_key_data("test_key", invalid_data) is False
+        assert worker._parse_redis_key_data("test_key", invalid_data) is None
 
 
-def test_process_redis_events_shared_digest_across_repositories():
+def test_process_redis_events_shared_digest_across_repositories(fake_redis):
     """Test _process_redis_events with same manifest digest in different repositories."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
@@ -1057,12 +1506,11 @@ def test_process_redis_events_shared_digest_across_repositories():
         worker = RedisFlushWorker()
 
         # Mock Redis client
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock Redis data - same manifest digest in different repositories
+        # Redis data - same manifest digest in different repositories
         shared_digest = "sha256:92a29b8e530685cb620b9aced7c2d447d091885f1c5a3ace8d98fb5855687d05"
-        mock_client.hgetall.side_effect = [
+        hashes = [
             # Repository 1: alpine tag pulls
             {
                 "repository_id": "1",
@@ -1098,9 +1546,7 @@ def test_process_redis_events_shared_digest_across_repositories():
             "pull_events:repo:1:digest:sha256:92a29b8e530685cb620b9aced7c2d447d091885f1c5a3ace8d98fb5855687d05",
             "pull_events:repo:2:tag:alpine:sha256:92a29b8e530685cb620b9aced7c2d447d091885f1c5a3ace8d98fb5855687d05",
         ]
-
-        # Mock RENAME operation for all keys
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
 
         # Test processing
         (
@@ -1145,20 +1591,7 @@ def test_process_redis_events_shared_digest_across_repositories():
 
 def test_flush_pull_metrics_database_failure():
     """Test _flush_pull_metrics when database flush fails."""
-    with patch("workers.pullstatsredisflushworker.app") as mock_app:
-        mock_app.config.get.side_effect = lambda key, default=None: {
-            "REDIS_FLUSH_INTERVAL_SECONDS": 300,
-            "REDIS_FLUSH_WORKER_BATCH_SIZE": 1000,
-            "REDIS_FLUSH_WORKER_SCAN_COUNT": 100,
-            "REDIS_CONNECTION_TIMEOUT": 5,
-            "PULL_METRICS_REDIS": {
-                "host": "localhost",
-                "port": 6379,
-                "db": 1,
-                "password": None,
-            },
-        }.get(key, default)
-
+    with patch("workers.pullstatsredisflushworker.app"):
         with patch(
             "workers.pullstatsredisflushworker.bulk_upsert_tag_statistics"
         ) as mock_tag_upsert:
@@ -1180,15 +1613,19 @@ def test_flush_pull_metrics_database_failure():
                         ["pull_events:repo:123:tag:latest:sha256:abc"],
                     )
 
-                    # Mock hgetall to return valid data
-                    mock_client.hgetall.return_value = {
-                        "repository_id": "123",
-                        "tag_name": "latest",
-                        "manifest_digest": "sha256:abc123",
-                        "pull_count": "5",
-                        "last_pull_timestamp": "1694168400",
-                        "pull_method": "tag",
-                    }
+                    # Mock the pipelined HGETALL to return valid data
+                    mock_client.pipeline.return_value.execute.return_value = [
+                        _hash_reply(
+                            {
+                                "repository_id": "123",
+                                "tag_name": "latest",
+                                "manifest_digest": "sha256:abc123",
+                                "pull_count": "5",
+                                "last_pull_timestamp": "1694168400",
+                                "pull_method": "tag",
+                            }
+                        )
+                    ]
 
                     worker._flush_pull_metrics()
 
@@ -1198,8 +1635,38 @@ def test_flush_pull_metrics_database_failure():
                     # Note: manifest_upsert may not be called if tag_upsert fails first
                     # mock_manifest_upsert.assert_called_once()
 
-                    # Verify cleanup was NOT called due to database failure
-                    mock_client.delete.assert_not_called()
+                    # Verify cleanup was NOT called due to database failure; only the pending
+                    # flag is cleared and then set again for the retry
+                    mock_client.delete.assert_called_once_with(PULL_EVENTS_PENDING_KEY)
+                    mock_client.pipeline.return_value.unlink.assert_not_called()
+                    mock_client.set.assert_called_once_with(PULL_EVENTS_PENDING_KEY, 1)
+
+
+def test_flush_pull_metrics_skips_scan_without_pending_events():
+    """Test that once the first scan is done, cycles without pending events skip SCAN."""
+    with patch("workers.pullstatsredisflushworker.app") as mock_app:
+        mock_app.config.get.return_value = 300
+
+        worker = RedisFlushWorker()
+        mock_client = MagicMock()
+        mock_client.exists.return_value = 0
+        mock_client.scan.return_value = (0, [])
+        worker.redis_client = mock_client
+
+        # The first cycle scans regardless of the flag
+        worker._flush_pull_metrics()
+        mock_client.exists.assert_not_called()
+        mock_client.delete.assert_called_once_with(PULL_EVENTS_PENDING_KEY)
+        assert mock_client.scan.call_count == 1
+
+        worker._flush_pull_metrics()
+        mock_client.exists.assert_called_once_with(PULL_EVENTS_PENDING_KEY)
+        assert mock_client.scan.call_count == 1
+
+        # A producer write sets the flag and the next cycle scans again
+        mock_client.exists.return_value = 1
+        worker._flush_pull_metrics()
+        assert mock_client.scan.call_count == 2
 
 
 def test_flush_pull_metrics_general_exception():
@@ -1216,28 +1683,28 @@ def test_flush_pull_metrics_general_exception():
         worker._flush_pull_metrics()  # No exception should be raised
 
 
-def test_process_redis_events_invalid_data_validation():
+def test_process_redis_events_invalid_data_validation(fake_redis):
     """Test _process_redis_events with invalid data that fails validation."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock hgetall to return invalid data
-        mock_client.hgetall.return_value = {
-            "repository_id": "0",  # Invalid repository_id
-            "tag_name": "latest",
-            "manifest_digest": "sha256:abc123",
-            "pull_count": "5",
-            "last_pull_timestamp": "1694168400",
-            "pull_method": "tag",
-        }
+        # Invalid data as written to Redis
+        hashes = [
+            {
+                "repository_id": "0",  # Invalid repository_id
+                "tag_name": "latest",
+                "manifest_digest": "sha256:abc123",
+                "pull_count": "5",
+                "last_pull_timestamp": "1694168400",
+                "pull_method": "tag",
+            }
+        ]
 
         keys = ["pull_events:repo:123:tag:latest:sha256:abc"]
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Invalid data should be cleaned up immediately (not in db_dependent)
@@ -1246,17 +1713,16 @@ def test_process_redis_events_invalid_data_validation():
         assert len(manifest_updates) == 0
 
 
-def test_process_redis_events_manifest_aggregation_timestamp_handling():
+def test_process_redis_events_manifest_aggregation_timestamp_handling(fake_redis):
     """Test manifest aggregation with different timestamp scenarios."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock Redis data with different timestamps
-        mock_client.hgetall.side_effect = [
+        # Redis data with different timestamps
+        hashes = [
             {
                 "repository_id": "123",
                 "tag_name": "",
@@ -1275,13 +1741,12 @@ def test_process_redis_events_manifest_aggregation_timestamp_handling():
             },
         ]
 
+        # A fresh key plus an orphaned processing key for the same manifest
         keys = [
             "pull_events:repo:123:digest:sha256:abc123",
-            "pull_events:repo:123:digest:sha256:abc123",
+            "pull_events:repo:123:digest:sha256:abc123:processing:1694168400000:0a1b2c3d",
         ]
-
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Should aggregate manifest pulls
@@ -1293,17 +1758,16 @@ def test_process_redis_events_manifest_aggregation_timestamp_handling():
         assert manifest["last_pull_timestamp"].timestamp() == 1694168500
 
 
-def test_process_redis_events_manifest_aggregation_no_existing_timestamp():
+def test_process_redis_events_manifest_aggregation_no_existing_timestamp(fake_redis):
     """Test manifest aggregation when existing entry has no timestamp."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock Redis data - first entry with no timestamp, second with timestamp
-        mock_client.hgetall.side_effect = [
+        # Redis data - first entry with no timestamp, second with timestamp
+        hashes = [
             {
                 "repository_id": "123",
                 "tag_name": "",
@@ -1322,13 +1786,12 @@ def test_process_redis_events_manifest_aggregation_no_existing_timestamp():
             },
         ]
 
+        # A fresh key plus an orphaned processing key for the same manifest
         keys = [
             "pull_events:repo:123:digest:sha256:abc123",
-            "pull_events:repo:123:digest:sha256:abc123",
+            "pull_events:repo:123:digest:sha256:abc123:processing:1694168400000:0a1b2c3d",
         ]
-
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Should aggregate manifest pulls
@@ -1340,17 +1803,16 @@ def test_process_redis_events_manifest_aggregation_no_existing_timestamp():
         assert manifest["last_pull_timestamp"].timestamp() == 1694168500
 
 
-def test_process_redis_events_tag_aggregation_timestamp_handling():
+def test_process_redis_events_tag_aggregation_timestamp_handling(fake_redis):
     """Test tag aggregation with different timestamp scenarios."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock Redis data with different timestamps for same tag
-        mock_client.hgetall.side_effect = [
+        # Redis data with different timestamps for same tag
+        hashes = [
             {
                 "repository_id": "123",
                 "tag_name": "latest",
@@ -1373,9 +1835,7 @@ def test_process_redis_events_tag_aggregation_timestamp_handling():
             "pull_events:repo:123:tag:latest:sha256:abc123",
             "pull_events:repo:123:tag:latest:sha256:def456",
         ]
-
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Should aggregate tag pulls
@@ -1388,17 +1848,16 @@ def test_process_redis_events_tag_aggregation_timestamp_handling():
         assert tag["manifest_digest"] == "sha256:def456"
 
 
-def test_process_redis_events_tag_aggregation_no_existing_timestamp():
+def test_process_redis_events_tag_aggregation_no_existing_timestamp(fake_redis):
     """Test tag aggregation when existing entry has no timestamp."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock Redis data - first entry with no timestamp, second with timestamp
-        mock_client.hgetall.side_effect = [
+        # Redis data - first entry with no timestamp, second with timestamp
+        hashes = [
             {
                 "repository_id": "123",
                 "tag_name": "latest",
@@ -1421,9 +1880,7 @@ def test_process_redis_events_tag_aggregation_no_existing_timestamp():
             "pull_events:repo:123:tag:latest:sha256:abc123",
             "pull_events:repo:123:tag:latest:sha256:def456",
         ]
-
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Should aggregate tag pulls
@@ -1443,7 +1900,7 @@ def test_process_redis_events_general_exception_during_processing():
 
         worker = RedisFlushWorker()
         mock_client = MagicMock()
-        mock_client.hgetall.side_effect = Exception("Unexpected error")
+        mock_client.pipeline.return_value.execute.side_effect = Exception("Unexpected error")
         worker.redis_client = mock_client
 
         keys = ["pull_events:repo:123:tag:latest:sha256:abc"]
@@ -1468,6 +1925,7 @@ def test_cleanup_redis_keys_empty_keys():
 
         # Should not call delete
         mock_client.delete.assert_not_called()
+        mock_client.pipeline.assert_not_called()
 
 
 def test_cleanup_redis_keys_general_exception():
@@ -1477,7 +1935,7 @@ def test_cleanup_redis_keys_general_exception():
 
         worker = RedisFlushWorker()
         mock_client = MagicMock()
-        mock_client.delete.side_effect = Exception("Unexpected error")
+        mock_client.pipeline.return_value.execute.side_effect = Exception("Unexpected error")
         worker.redis_client = mock_client
 
         keys = {"key1", "key2"}
@@ -1487,20 +1945,7 @@ def test_cleanup_redis_keys_general_exception():
 
 def test_flush_pull_metrics_with_cleanup_keys_only():
     """Test _flush_pull_metrics with only cleanable keys (no database operations)."""
-    with patch("workers.pullstatsredisflushworker.app") as mock_app:
-        mock_app.config.get.side_effect = lambda key, default=None: {
-            "REDIS_FLUSH_INTERVAL_SECONDS": 300,
-            "REDIS_FLUSH_WORKER_BATCH_SIZE": 1000,
-            "REDIS_FLUSH_WORKER_SCAN_COUNT": 100,
-            "REDIS_CONNECTION_TIMEOUT": 5,
-            "PULL_METRICS_REDIS": {
-                "host": "localhost",
-                "port": 6379,
-                "db": 1,
-                "password": None,
-            },
-        }.get(key, default)
-
+    with patch("workers.pullstatsredisflushworker.app"):
         with patch("workers.pullstatsredisflushworker.redis") as mock_redis_module:
             mock_client = MagicMock()
             mock_client.ping.return_value = True
@@ -1511,26 +1956,30 @@ def test_flush_pull_metrics_with_cleanup_keys_only():
             # Mock scan to return a key
             mock_client.scan.return_value = (0, ["pull_events:repo:123:tag:latest:sha256:abc"])
 
-            # Mock hgetall to return empty data (cleanable)
-            mock_client.hgetall.return_value = {}
+            # Mock the pipelined HGETALL to return empty data (cleanable)
+            mock_client.pipeline.return_value.execute.return_value = [_hash_reply({})]
 
             worker._flush_pull_metrics()
 
-            # Should clean up empty keys
-            mock_client.delete.assert_called()
+            # Should clean up empty keys with the pipelined cleanup
+            mock_client.delete.assert_called_once_with(PULL_EVENTS_PENDING_KEY)
+            mock_client.pipeline.return_value.unlink.assert_called_once()
+            (processing_key,) = mock_client.pipeline.return_value.unlink.call_args.args
+            assert processing_key.startswith(
+                "pull_events:repo:123:tag:latest:sha256:abc:processing:"
+            )
 
 
-def test_process_redis_events_manifest_aggregation_with_none_timestamp():
+def test_process_redis_events_manifest_aggregation_with_none_timestamp(fake_redis):
     """Test manifest aggregation when new entry has None timestamp."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock Redis data - first entry with timestamp, second with None timestamp
-        mock_client.hgetall.side_effect = [
+        # Redis data - first entry with timestamp, second with None timestamp
+        hashes = [
             {
                 "repository_id": "123",
                 "tag_name": "",
@@ -1549,13 +1998,12 @@ def test_process_redis_events_manifest_aggregation_with_none_timestamp():
             },
         ]
 
+        # A fresh key plus an orphaned processing key for the same manifest
         keys = [
             "pull_events:repo:123:digest:sha256:abc123",
-            "pull_events:repo:123:digest:sha256:abc123",
+            "pull_events:repo:123:digest:sha256:abc123:processing:1694168400000:0a1b2c3d",
         ]
-
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Should aggregate manifest pulls
@@ -1567,17 +2015,16 @@ def test_process_redis_events_manifest_aggregation_with_none_timestamp():
         assert manifest["last_pull_timestamp"].timestamp() == 1694168400
 
 
-def test_process_redis_events_tag_aggregation_with_none_timestamp():
+def test_process_redis_events_tag_aggregation_with_none_timestamp(fake_redis):
     """Test tag aggregation when new entry has None timestamp."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock Redis data - first entry with timestamp, second with None timestamp
-        mock_client.hgetall.side_effect = [
+        # Redis data - first entry with timestamp, second with None timestamp
+        hashes = [
             {
                 "repository_id": "123",
                 "tag_name": "latest",
@@ -1600,9 +2047,7 @@ def test_process_redis_events_tag_aggregation_with_none_timestamp():
             "pull_events:repo:123:tag:latest:sha256:abc123",
             "pull_events:repo:123:tag:latest:sha256:def456",
         ]
-
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Should aggregate tag pulls
@@ -1622,7 +2067,7 @@ def test_cleanup_redis_keys_redis_error_during_cleanup():
 
         worker = RedisFlushWorker()
         mock_client = MagicMock()
-        mock_client.delete.side_effect = redis.RedisError("Connection error")
+        mock_client.pipeline.return_value.execute.side_effect = redis.RedisError("Connection error")
         worker.redis_client = mock_client
 
         keys = {"key1", "key2"}
@@ -1674,28 +2119,28 @@ def test_create_gunicorn_worker_with_feature_disabled():
                 assert call_args[0][3] is False  # Uses feature flag value
 
 
-def test_process_redis_events_validation_failure():
+def test_process_redis_events_validation_failure(fake_redis):
     """Test _process_redis_events with data that fails validation."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock hgetall to return data that fails validation
-        mock_client.hgetall.return_value = {
-            "repository_id": "123",
-            "tag_name": "latest",
-            "manifest_digest": "invalid_digest",  # Invalid digest
-            "pull_count": "5",
-            "last_pull_timestamp": "1694168400",
-            "pull_method": "tag",
-        }
+        # Data that fails validation as written to Redis
+        hashes = [
+            {
+                "repository_id": "123",
+                "tag_name": "latest",
+                "manifest_digest": "invalid_digest",  # Invalid digest
+                "pull_count": "5",
+                "last_pull_timestamp": "1694168400",
+                "pull_method": "tag",
+            }
+        ]
 
         keys = ["pull_events:repo:123:tag:latest:sha256:abc"]
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Invalid data should be cleaned up immediately (not in db_dependent)
@@ -1704,17 +2149,16 @@ def test_process_redis_events_validation_failure():
         assert len(manifest_updates) == 0
 
 
-def test_process_redis_events_manifest_aggregation_both_timestamps_none():
+def test_process_redis_events_manifest_aggregation_both_timestamps_none(fake_redis):
     """Test manifest aggregation when both entries have None timestamps."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock Redis data - both entries with no timestamp
-        mock_client.hgetall.side_effect = [
+        # Redis data - both entries with no timestamp
+        hashes = [
             {
                 "repository_id": "123",
                 "tag_name": "",
@@ -1733,13 +2177,12 @@ def test_process_redis_events_manifest_aggregation_both_timestamps_none():
             },
         ]
 
+        # A fresh key plus an orphaned processing key for the same manifest
         keys = [
             "pull_events:repo:123:digest:sha256:abc123",
-            "pull_events:repo:123:digest:sha256:abc123",
+            "pull_events:repo:123:digest:sha256:abc123:processing:1694168400000:0a1b2c3d",
         ]
-
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Should aggregate manifest pulls
@@ -1749,17 +2192,16 @@ def test_process_redis_events_manifest_aggregation_both_timestamps_none():
         assert manifest["last_pull_timestamp"] is None  # Both were None
 
 
-def test_process_redis_events_tag_aggregation_both_timestamps_none():
+def test_process_redis_events_tag_aggregation_both_timestamps_none(fake_redis):
     """Test tag aggregation when both entries have None timestamps."""
     with patch("workers.pullstatsredisflushworker.app") as mock_app:
         mock_app.config.get.return_value = 300
 
         worker = RedisFlushWorker()
-        mock_client = MagicMock()
-        worker.redis_client = mock_client
+        worker.redis_client = fake_redis
 
-        # Mock Redis data - both entries with no timestamp
-        mock_client.hgetall.side_effect = [
+        # Redis data - both entries with no timestamp
+        hashes = [
             {
                 "repository_id": "123",
                 "tag_name": "latest",
@@ -1782,9 +2224,7 @@ def test_process_redis_events_tag_aggregation_both_timestamps_none():
             "pull_events:repo:123:tag:latest:sha256:abc123",
             "pull_events:repo:123:tag:latest:sha256:def456",
         ]
-
-        # Mock RENAME operation
-        mock_client.rename.return_value = None
+        _load_hashes(fake_redis, keys, hashes)
         tag_updates, manifest_updates, db_dependent = worker._process_redis_events(keys)
 
         # Should aggregate tag pulls
@@ -1802,7 +2242,7 @@ def test_cleanup_redis_keys_general_exception_during_cleanup():
 
         worker = RedisFlushWorker()
         mock_client = MagicMock()
-        mock_client.delete.side_effect = Exception("Unexpected error")
+        mock_client.pipeline.return_value.execute.side_effect = Exception("Unexpected error")
         worker.redis_client = mock_client
 
         keys = {"key1", "key2"}
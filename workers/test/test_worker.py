@@ -1,7 +1,10 @@
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from workers.worker import (
     Worker,
+    with_exponential_backoff,
     worker_operation_duration,
     worker_operation_in_progress,
 )
@@ -64,6 +67,7 @@ def test_exception_capture_in_operation():
         patch("workers.worker.app") as mock_app,
         patch("workers.worker.sentry_sdk") as mock_sentry_sdk,
         patch("workers.worker.UseThenDisconnect") as mock_use_then_disconnect,
+        patch("workers.worker._SENTRY_INITIALIZED", False),
     ):
 
         mock_app.config.get.side_effect = lambda key, default=None: {
@@ -161,7 +165,8 @@ def test_default_sentry_config_values():
     with (
         patch("workers.worker.app") as mock_app,
         patch("workers.worker.sentry_sdk") as mock_sentry_sdk,
-        patch("socket.gethostname") as mock_hostname,
+        patch("workers.worker._HOSTNAME", "test-host"),
+        patch("workers.worker._SENTRY_INITIALIZED", False),
     ):
 
         mock_app.config.get.side_effect = lambda key, default=None: {
@@ -169,8 +174,6 @@ def test_default_sentry_config_values():
             "SENTRY_DSN": "https://test@sentry.io/123",
         }.get(key, default)
 
-        mock_hostname.return_value = "test-host"
-
         worker = Worker()
 
         call_args = mock_sentry_sdk.init.call_args
@@ -184,3 +187,66 @@ def test_default_sentry_config_values():
 
         # Verify the SDK was called exactly once
         assert mock_sentry_sdk.init.call_count == 1
+        mock_sentry_sdk.set_tag.assert_called_once_with("worker", "test-host:worker-Worker")
+
+
+def test_start_schedules_operations_from_one_start_date():
+    """Test that unstaggered operations all share a single first-run time."""
+    with (
+        patch("workers.worker.app") as mock_app,
+        patch("workers.worker.logging.config.fileConfig"),
+    ):
+        mock_app.config.get.side_effect = lambda key, default=None: {
+            "SETUP_COMPLETE": True,
+            "STAGGER_WORKERS": False,
+        }.get(key, default)
+
+        worker = Worker()
+        worker._sched = MagicMock()
+        worker._setup_and_wait_for_shutdown = MagicMock()
+
+        worker.add_operation(lambda: None, 60)
+        worker.add_operation(lambda: None, 300)
+        worker.start()
+
+        start_dates = [call.kwargs["start_date"] for call in worker._sched.add_job.call_args_list]
+        assert len(start_dates) == 2
+        assert start_dates[0] == start_dates[1]
+
+
+def test_sentry_initialized_once_per_process():
+    """Test that later workers reuse the Sentry client and only update the worker tag."""
+    with (
+        patch("workers.worker.app") as mock_app,
+        patch("workers.worker.sentry_sdk") as mock_sentry_sdk,
+        patch("workers.worker._HOSTNAME", "test-host"),
+        patch("workers.worker._SENTRY_INITIALIZED", False),
+    ):
+        mock_app.config.get.side_effect = lambda key, default=None: {
+            "EXCEPTION_LOG_TYPE": "Sentry",
+            "SENTRY_DSN": "https://test@sentry.io/123",
+        }.get(key, default)
+
+        Worker()
+        Worker()
+
+        assert mock_sentry_sdk.init.call_count == 1
+        assert mock_sentry_sdk.set_tag.call_count == 2
+        mock_sentry_sdk.set_tag.assert_called_with("worker", "test-host:worker-Worker")
+
+
+def test_exponential_backoff_schedule_and_reraise():
+    """Test that retries sleep on the capped exponential schedule and re-raise the last error."""
+    calls = []
+
+    @with_exponential_backoff(backoff_multiplier=4, max_backoff=10, max_retries=4)
+    def failing():
+        calls.append(1)
+        raise ValueError("boom")
+
+    with patch("workers.worker.time.sleep") as mock_sleep:
+        with pytest.raises(ValueError, match="boom"):
+            failing()
+
+    assert len(calls) == 4
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [4, 8, 10]
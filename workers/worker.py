@@ -24,6 +24,9 @@ from util.saas.exceptionlog import _sentry_before_send_ignore_known
 
 logger = logging.getLogger(__name__)
 
+_HOSTNAME = socket.gethostname()
+_SENTRY_INITIALIZED = False
+
 WORKER_DURATION_BUCKETS = (
     60,
     300,
@@ -62,20 +65,23 @@ def with_exponential_backoff(backoff_multiplier=10, max_backoff=3600, max_retrie
         then re-raise the exception.
         """
 
+        # Retries past the end of the schedule keep sleeping for its last (capped) entry
+        schedule = tuple(
+            min(2**i * backoff_multiplier, max_backoff) for i in range(max_retries or 32)
+        )
+
         def wrapper(*args, **kwargs):
             attempts = 0
-            backoff = 0
 
             while True:
-                next_backoff = 2**attempts * backoff_multiplier
-                backoff = min(next_backoff, max_backoff)
+                backoff = schedule[min(attempts, len(schedule) - 1)]
                 attempts += 1
 
                 try:
                     return func(*args, **kwargs)
-                except Exception as e:
+                except Exception:
                     if max_retries is not None and attempts == max_retries:
-                        raise e
+                        raise
 
                 logger.exception("Operation raised exception, retrying in %d seconds", backoff)
                 time.sleep(backoff)
@@ -85,6 +91,59 @@ def with_exponential_backoff(backoff_multiplier=10, max_backoff=3600, max_retrie
     return inner
 
 
+def _init_sentry_once(worker_name):
+    """
+    Initializes Sentry for this process if configured and tags events with the worker's name.
+
+    sentry_sdk.init rebuilds its transport and integrations on every call, so it only runs for
+    the first worker constructed in the process; later workers just update the tag.
+    """
+    global _SENTRY_INITIALIZED
+
+    if app.config.get("EXCEPTION_LOG_TYPE", "FakeSentry") != "Sentry":
+        return
+
+    sentry_dsn = app.config.get("SENTRY_DSN", "")
+    if not sentry_dsn:
+        return
+
+    try:
+        if not _SENTRY_INITIALIZED:
+            integrations = []
+
+            # Always include logging integration
+            integrations.append(LoggingIntegration(level=logging.INFO, event_level=logging.ERROR))
+
+            # Only add Flask and SQLAlchemy integrations if OpenTelemetry is not enabled
+            if not getattr(features, "OTEL_TRACING", False):
+                integrations.extend(
+                    [
+                        FlaskIntegration(transaction_style="endpoint"),
+                        SqlalchemyIntegration(),
+                        StdlibIntegration(),
+                    ]
+                )
+            else:
+                logger.info("OpenTelemetry enabled - using minimal Sentry integrations for worker")
+
+            sentry_sdk.init(
+                dsn=sentry_dsn,
+                environment=app.config.get("SENTRY_ENVIRONMENT", "production"),
+                traces_sample_rate=app.config.get("SENTRY_TRACES_SAMPLE_RATE", 0.1),
+                profiles_sample_rate=app.config.get("SENTRY_PROFILES_SAMPLE_RATE", 0.1),
+                sample_rate=app.config.get("SENTRY_SAMPLE_RATE", 0.1),
+                integrations=integrations,
+                default_integrations=False,
+                auto_session_tracking=True,
+                before_send=_sentry_before_send_ignore_known,
+            )
+            _SENTRY_INITIALIZED = True
+
+        sentry_sdk.set_tag("worker", worker_name)
+    except Exception as e:
+        logger.warning("Failed to initialize Sentry: %s", str(e))
+
+
 class Worker(object):
     """
     Base class for workers which perform some work periodically.
@@ -96,47 +155,9 @@ class Worker(object):
         self._stop = Event()
         self._terminated = Event()
 
-        worker_name = "%s:worker-%s" % (socket.gethostname(), self.__class__.__name__)
+        worker_name = "%s:worker-%s" % (_HOSTNAME, self.__class__.__name__)
 
-        if app.config.get("EXCEPTION_LOG_TYPE", "FakeSentry") == "Sentry":
-            sentry_dsn = app.config.get("SENTRY_DSN", "")
-            if sentry_dsn:
-                try:
-                    integrations = []
-
-                    # Always include logging integration
-                    integrations.append(
-                        LoggingIntegration(level=logging.INFO, event_level=logging.ERROR)
-                    )
-
-                    # Only add Flask and SQLAlchemy integrations if OpenTelemetry is not enabled
-                    if not getattr(features, "OTEL_TRACING", False):
-                        integrations.extend(
-                            [
-                                FlaskIntegration(transaction_style="endpoint"),
-                                SqlalchemyIntegration(),
-                                StdlibIntegration(),
-                            ]
-                        )
-                    else:
-                        logger.info(
-                            "OpenTelemetry enabled - using minimal Sentry integrations for worker"
-                        )
-
-                    sentry_sdk.init(
-                        dsn=sentry_dsn,
-                        environment=app.config.get("SENTRY_ENVIRONMENT", "production"),
-                        traces_sample_rate=app.config.get("SENTRY_TRACES_SAMPLE_RATE", 0.1),
-                        profiles_sample_rate=app.config.get("SENTRY_PROFILES_SAMPLE_RATE", 0.1),
-                        sample_rate=app.config.get("SENTRY_SAMPLE_RATE", 0.1),
-                        integrations=integrations,
-                        default_integrations=False,
-                        auto_session_tracking=True,
-                        before_send=_sentry_before_send_ignore_known,
-                    )
-                    sentry_sdk.set_tag("worker", worker_name)
-                except Exception as e:
-                    logger.warning("Failed to initialize Sentry: %s", str(e))
+        _init_sentry_once(worker_name)
 
     def is_healthy(self):
         return not self._stop.is_set()
@@ -181,8 +202,7 @@ class Worker(object):
         signal.signal(signal.SIGTERM, self.terminate)
         signal.signal(signal.SIGINT, self.terminate)
 
-        while not self._stop.wait(1):
-            pass
+        self._stop.wait()
 
     def start(self):
         logging.config.fileConfig(logfile_path(debug=False), disable_existing_loggers=False)
@@ -200,9 +220,11 @@ class Worker(object):
         logger.debug("Scheduling worker.")
 
         self._sched.start()
+        base_start_date = datetime.now() + timedelta(milliseconds=1)
+        stagger = app.config.get("STAGGER_WORKERS")
         for operation_func, operation_sec in self._operations:
-            start_date = datetime.now() + timedelta(seconds=0.001)
-            if app.config.get("STAGGER_WORKERS"):
+            start_date = base_start_date
+            if stagger:
                 start_date += timedelta(seconds=randint(1, operation_sec))
             logger.debug("First run scheduled for %s", start_date)
             self._sched.add_job(